@@ -0,0 +1,167 @@
+import atexit
+import datetime
+import gzip
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+####### Record/replay of NiFi API traffic
+# NIFI_RECORD=<file> saves every request/response of a capture to a gzipped JSON-lines cassette,
+# NIFI_REPLAY=<file> serves the capture from that cassette without touching the network.
+# Requests are matched by method, path and query (never host), so a cassette replays anywhere.
+
+RECORD_ENV = "NIFI_RECORD"
+REPLAY_ENV = "NIFI_REPLAY"
+REPLAY_LATENCY_ENV = "NIFI_REPLAY_LATENCY"
+CASSETTE_VERSION = 1
+MASK = "********"
+RE_SENSITIVE_KEY = re.compile(r"password|passphrase|secret|token|credential|private.?key|api.?key", re.IGNORECASE)
+
+def interaction_key(method, url, params=None):
+    """METHOD /path?sorted-query, independent of the host the capture ran against"""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    query.extend((str(k), str(v)) for k, v in (params or {}).items() if v is not None)
+    key = f"{method.upper()} {parts.path}"
+    return f"{key}?{urlencode(sorted(query))}" if query else key
+
+def scrub(value):
+    """Mask secrets in a decoded JSON body: values of sensitive-looking keys and of sensitive parameters"""
+    if isinstance(value, list):
+        return [scrub(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    scrubbed = {}
+    for key, item in value.items():
+        if isinstance(item, str) and item and RE_SENSITIVE_KEY.search(key):
+            scrubbed[key] = MASK
+        else:
+            scrubbed[key] = scrub(item)
+    if scrubbed.get("sensitive") is True and isinstance(scrubbed.get("value"), str):
+        scrubbed["value"] = MASK
+    return scrubbed
+
+def scrub_body(key, text):
+    if key.endswith("/access/token"):
+        return "REDACTED-TOKEN"
+    try:
+        return json.dumps(scrub(json.loads(text)))
+    except ValueError:
+        return text
+
+class CassetteResponse:
+    """The part of requests.Response the API helpers use"""
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+class RecordingTransport:
+    """Pass requests through to the real transport and append each interaction to the cassette"""
+    def __init__(self, transport, path):
+        self.transport = transport
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = gzip.open(path, "wt", encoding="utf-8")
+        self.file.write(json.dumps({"version": CASSETTE_VERSION,
+                                    "recorded": datetime.datetime.now().isoformat(timespec="seconds")}) + "\n")
+        atexit.register(self.close)
+
+    def _record(self, method, url, params, call):
+        started = time.perf_counter()
+        response = call()
+        elapsed = time.perf_counter() - started
+        key = interaction_key(method, url, params)
+        line = json.dumps({"key": key, "status": response.status_code,
+                           "elapsed": round(elapsed, 4), "body": scrub_body(key, response.text)})
+        with self.lock:
+            self.file.write(line + "\n")
+        return response
+
+    def get(self, url, params=None, **kwargs):
+        return self._record("GET", url, params, lambda: self.transport.get(url, params=params, **kwargs))
+
+    def post(self, url, **kwargs):
+        return self._record("POST", url, None, lambda: self.transport.post(url, **kwargs))
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+def load_cassette(path):
+    """Return (header, {key: [interactions in recorded order]})"""
+    interactions = defaultdict(list)
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != CASSETTE_VERSION:
+            raise Exception(f"Unsupported cassette version {header.get('version')} in {path}")
+        for line in f:
+            interaction = json.loads(line)
+            interactions[interaction["key"]].append(interaction)
+    return header, interactions
+
+class ReplayTransport:
+    """Serve every request from a cassette; repeated requests get the recorded responses in order, then the last one"""
+    def __init__(self, path, latency=False):
+        self.path = path
+        self.latency = latency
+        self.header, self.interactions = load_cassette(path)
+        self.served = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def _replay(self, method, url, params):
+        key = interaction_key(method, url, params)
+        recorded = self.interactions.get(key)
+        if not recorded:
+            raise Exception(f"No recorded response for {key} in cassette {self.path}")
+        with self.lock:
+            interaction = recorded[min(self.served[key], len(recorded) - 1)]
+            self.served[key] += 1
+        if self.latency:
+            time.sleep(interaction["elapsed"])
+        return CassetteResponse(interaction["status"], interaction["body"])
+
+    def get(self, url, params=None, **kwargs):
+        return self._replay("GET", url, params)
+
+    def post(self, url, **kwargs):
+        return self._replay("POST", url, None)
+
+def replaying():
+    return bool(os.environ.get(REPLAY_ENV))
+
+def transport_from_env(transport):
+    """The transport the API helpers should use: replay, record around the real one, or the real one"""
+    if os.environ.get(REPLAY_ENV):
+        return ReplayTransport(os.environ[REPLAY_ENV], latency=bool(os.environ.get(REPLAY_LATENCY_ENV)))
+    if os.environ.get(RECORD_ENV):
+        return RecordingTransport(transport, os.environ[RECORD_ENV])
+    return transport
+
+def summarize(path, top=10):
+    """Print request counts and the slowest endpoints of a cassette"""
+    header, interactions = load_cassette(path)
+    total = sum(len(recorded) for recorded in interactions.values())
+    elapsed = sum(i["elapsed"] for recorded in interactions.values() for i in recorded)
+    print(f"Cassette      : {path}")
+    print(f"Recorded      : {header.get('recorded')}")
+    print(f"Requests      : {total} ({len(interactions)} distinct)")
+    print(f"Time in API   : {elapsed:.2f}s (sum over all requests)")
+    print(f"\nSlowest endpoints (total time, calls):")
+    slowest = sorted(interactions.items(), key=lambda item: sum(i["elapsed"] for i in item[1]), reverse=True)
+    for key, recorded in slowest[:top]:
+        print(f"  {sum(i['elapsed'] for i in recorded):8.3f}s  {len(recorded):4d}  {key}")
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python Cassette.py <cassette.jsonl.gz>")
+        sys.exit(1)
+    summarize(sys.argv[1])
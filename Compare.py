@@ -1,101 +1,184 @@
-import re
 from collections import defaultdict
 import os
 import time
 
+import Snapshot
+import Structural_Match
+from Snapshot import parse_report_lines, read_scope, filter_records_to_scope, drop_records_under, fresh_snapshot, load_changed_shards
+from Compare_Cache import cache_key, file_digest, restore, store
+from Structural_Match import match_reports
+
+VERSION_FIELDS = ("Registry", "Bucket", "Flow ID", "Version", "State")
+BUNDLE_FIELDS = ("Bundle", "Bundle Status")
+
 def read_file_as_list(filename):
+    # Keep leading indentation: the tokenizer derives process group paths from it
     with open(filename, 'r') as file:
-        return [line.strip() for line in file.readlines() if line.strip()]
+        return [line.rstrip() for line in file.readlines() if line.strip()]
 
 def extract_all_components(lines):
+    return extract_components_from_records(parse_report_lines(lines))
+
+def extract_components_from_records(records):
+    """Build the per-section lookups Compare needs from the single-pass report tokenizer"""
     root_pgs = set()
     child_pgs = set()
     processors = set()
     param_contexts = set()
     param_context_details = defaultdict(dict)
     scheduling_info = defaultdict(dict)
+    controller_services = {}
+    runtime_status = {"processors": {}, "connections": {}}
+    connections = {}
+    processor_properties = {}
 
-    current_param_context = None
-    in_param_section = False
-    in_scheduling_section = False
-    current_processor_path = None
-    current_processor_name = None
-
-    for line_num, line in enumerate(lines):
-        # Root PG
-        if re.match(r"^\d+\.\s+(.*)\s+\(ID:.*\)", line):
-            root_pgs.add(re.sub(r"\(ID:.*", "", line).split(maxsplit=1)[1].strip())
-            continue
-
-        # Child PG
-        if line.startswith("➔ "):
-            match = re.match(r"➔ (.*)\s+\(ID:.*\)", line)
-            if match:
-                child_pgs.add(match.group(1).strip())
-            continue
-
-        # Processor
-        proc_match = re.match(r"^- Direct processors inside: \d+ \[(.*)\]", line)
-        if proc_match:
-            processor_list = proc_match.group(1).split(',')
-            for proc in processor_list:
-                proc_name = re.sub(r"\(ID:.*\)", "", proc).strip()
-                if proc_name and proc_name != "None":
-                    processors.add(proc_name)
-            continue
-
-        # Parameter Context start
-        if line.startswith("Parameter Context Name:"):
-            in_param_section = True
-            in_scheduling_section = False
-            current_param_context = re.sub(r"Parameter Context Name:\s*", "", line).split(" (ID")[0].strip()
-            param_contexts.add(current_param_context)
-            continue
+    for key, fields in records:
+        kind, component_id = key.split("|", 1)
 
-        # Parameter values
-        if in_param_section and line.startswith("- "):
-            param_line = line[2:]
-            if ':' in param_line:
-                key, value = param_line.split(':', 1)
-                param_context_details[current_param_context][key.strip()] = value.strip()
+        if kind == "process_group":
+            if fields["Kind"] == "Root Process Group":
+                root_pgs.add(fields["Name"])
+            else:
+                child_pgs.add(fields["Name"])
+        elif kind == "processor":
+            processors.add(fields["Name"])
+        elif kind == "parameter_context":
+            param_contexts.add(fields["Name"])
+        elif kind == "parameter":
+            param_context_details[fields["Context"]][fields["Name"]] = fields["Value"]
+        elif kind == "scheduling":
+            scheduling_info[fields["Path"]][fields.get("Processor Name")] = {
+                field: value for field, value in fields.items() if field not in ("Path", "Processor Name")}
+        elif kind == "controller_service":
+            service = {"properties": {}}
+            for field, value in fields.items():
+                if field.startswith("Property '"):
+                    service["properties"][field[len("Property '"):-1]] = value
+                elif field != "ID":
+                    service[field] = value
+            controller_services[fields["ID"]] = service
+        elif kind == "connection":
+            connections[fields["ID"]] = {field: value for field, value in fields.items() if field != "ID"}
+        elif kind == "processor_properties":
+            processor_properties[fields["ID"]] = {field: value for field, value in fields.items() if field != "ID"}
+        elif kind in ("processor_status", "connection_status"):
+            status_kind = "processors" if kind == "processor_status" else "connections"
+            runtime_status[status_kind][fields["ID"]] = {field: value for field, value in fields.items() if field != "ID"}
+
+    return root_pgs, child_pgs, processors, param_contexts, param_context_details, scheduling_info, controller_services, runtime_status, connections, processor_properties
+
+def extract_bundles(records):
+    """Bundle of every processor and controller service by ID, and the bundle inventory by coordinate"""
+    components = {}
+    bundles = {}
+    for key, fields in records:
+        kind, component_id = key.split("|", 1)
+        if kind in ("processor_properties", "controller_service") and "Bundle" in fields:
+            components[component_id] = {"Kind": "Processor" if kind == "processor_properties" else "Controller Service",
+                                        "Name": fields["Name"], "Bundle": fields["Bundle"],
+                                        "Bundle Status": fields.get("Bundle Status", "Unknown")}
+        elif kind == "bundle":
+            bundles[component_id] = fields
+    return components, bundles
+
+def extract_health(records):
+    """Bulletin message templates and validation errors of every component by ID"""
+    health = {}
+    for key, fields in records:
+        kind, component_id = key.split("|", 1)
+        if kind == "health":
+            errors = fields.get("Validation Errors", "None")
+            health[component_id] = {
+                "Name": fields["Name"],
+                "messages": {value.split("] ", 1)[-1]: value.split("] ", 1)[0].lstrip("[").split(" x")[0]
+                             for field, value in fields.items() if field.startswith("Message ")},
+                "validation_errors": set() if errors == "None" else set(errors.split(" | ")),
+            }
+    return health
+
+def extract_sections(records):
+    """Kinds of the sections a report was captured with, whether or not any of their records were loaded"""
+    return {key.split("|", 1)[1] for key, _ in records if key.startswith("section|")}
+
+def new_health_issues(good_health, bad_health):
+    """Per component, the bulletin templates and validation errors the Post-validation has and the Pre-validation had not"""
+    issues = {}
+    for component_id, good_data in good_health.items():
+        bad_data = bad_health.get(component_id, {"messages": {}, "validation_errors": set()})
+        messages = [(good_data["messages"][template], template) for template in sorted(good_data["messages"])
+                    if template not in bad_data["messages"]]
+        errors = sorted(good_data["validation_errors"] - bad_data["validation_errors"])
+        if messages or errors:
+            issues[component_id] = (good_data["Name"], messages, errors)
+    return issues
+
+def write_scope_note(scopes, file_handle):
+    file_handle.write("⚠️ Scoped comparison: only components inside the capture scope below are compared\n")
+    for scope in scopes:
+        for path in scope["path"]:
+            file_handle.write(f"  - Scope Path: {path}\n")
+        for path in scope["excluded_path"]:
+            file_handle.write(f"  - Excluded Path: {path}\n")
+        if scope["processor_types"]:
+            file_handle.write(f"  - Processor Types: {', '.join(scope['processor_types'])}\n")
+    file_handle.write("\n")
+
+def match_versioned_groups(good_records, bad_records):
+    """Pair versioned groups by ID; return the paths whose contents are not diffed, the matched paths and the version differences"""
+    good_vc = {key: fields for key, fields in good_records if key.startswith("version_control|")}
+    bad_vc = {key: fields for key, fields in bad_records if key.startswith("version_control|")}
+    skipped_paths, matched, differences = [], [], []
+
+    for key in sorted(set(good_vc) | set(bad_vc)):
+        good, bad = good_vc.get(key), bad_vc.get(key)
+        path = (good or bad)["Path"]
+        if good and bad and all(good[f] == bad[f] for f in VERSION_FIELDS) and good["State"] == "UP_TO_DATE":
+            matched.append(path)
+            skipped_paths.append(path)
             continue
 
-        # Scheduling section start
-        if "Below are the Scheduling Info" in line:
-            in_scheduling_section = True
-            in_param_section = False
-            continue
+        not_captured = any(side and side["Contents"] == "not captured" for side in (good, bad))
+        if not_captured:
+            skipped_paths.append(path)
+        diffs = [(field, (good or {}).get(field, "Not versioned"), (bad or {}).get(field, "Not versioned"))
+                 for field in VERSION_FIELDS if (good or {}).get(field) != (bad or {}).get(field)]
+        # The same version in the same state (e.g. LOCALLY_MODIFIED on both sides) is not a difference:
+        # its contents are diffed like any other group's
+        if diffs or not_captured:
+            differences.append((path, diffs, not_captured))
+
+    return skipped_paths, matched, differences
+
+def write_versioned_groups(matched, differences, file_handle):
+    file_handle.write("=== Versioned Process Group Differences ===\n\n")
+    if matched:
+        file_handle.write(f"  ✅ {len(matched)} versioned group(s) are up to date at the same registry version on both sides; their contents were not compared\n\n")
+
+    for path, diffs, not_captured in differences:
+        file_handle.write(f"Path: {path}\n")
+        for field, good_val, bad_val in diffs:
+            file_handle.write(f"    - {field}: Post-validation = {good_val} | Pre-validation = {bad_val}\n")
+        if not_captured:
+            file_handle.write("    ⚠️ Contents not captured on one side, so they were not compared\n")
+        file_handle.write("\n")
 
-        # Skip divider lines in scheduling section
-        if in_scheduling_section and line.startswith("----"):
-            continue
+    if not differences:
+        file_handle.write("  ✅ No versioned process group differences found\n\n")
+    return len(differences)
 
-        # Scheduling processor path
-        if in_scheduling_section and line.startswith("Path: "):
-            current_processor_path = line.replace("Path: ", "").strip()
-            current_processor_name = None
-            continue
+def write_structural_changes(changes, file_handle):
+    file_handle.write("=== Renamed / Recreated Components ===\n\n")
+    for kind, bad_node, good_node, labels in changes:
+        name = bad_node['Name'] if bad_node['Name'] == good_node['Name'] else f"{bad_node['Name']} -> {good_node['Name']}"
+        file_handle.write(f"{kind}: {name} ({', '.join(labels)})\n")
+        file_handle.write(f"    - Pre-validation : {bad_node['Path']} (ID: {bad_node['ID']})\n")
+        file_handle.write(f"    - Post-validation: {good_node['Path']} (ID: {good_node['ID']})\n")
+    file_handle.write("\n")
 
-        # Scheduling details - more robust parsing
-        if in_scheduling_section and current_processor_path and line.strip() and ":" in line:
-            # Look for Processor Name
-            if line.strip().startswith("Processor Name"):
-                current_processor_name = line.split(":", 1)[1].strip()
-                if current_processor_path not in scheduling_info:
-                    scheduling_info[current_processor_path] = {}
-                if current_processor_name not in scheduling_info[current_processor_path]:
-                    scheduling_info[current_processor_path][current_processor_name] = {}
-            # Look for other scheduling fields when we have a processor name
-            elif current_processor_name and not line.startswith("Path:"):
-                stripped_line = line.strip()
-                if ":" in stripped_line:
-                    key_val = stripped_line.split(":", 1)
-                    if len(key_val) == 2:
-                        key = key_val[0].strip()
-                        val = key_val[1].strip()
-                        scheduling_info[current_processor_path][current_processor_name][key] = val
-
-    return root_pgs, child_pgs, processors, param_contexts, param_context_details, scheduling_info
+def drop_paired_names(missing, unpaired, kind):
+    """Names reported as missing only because their component was renamed or recreated: every component
+    with the name on its side was paired, so none is left unpaired"""
+    return [name for name in missing if (kind, name) in unpaired]
 
 def compare_sets(good_set, bad_set):
     return sorted(list(good_set - bad_set))
@@ -236,6 +319,196 @@ def compare_scheduling_period_only(good_sched, bad_sched, file_handle):
     if not diff_found:
         file_handle.write("  ✅ No scheduling period differences found\n\n")
 
+def compare_controller_services(good_cs, bad_cs, file_handle):
+    """Diff controller services by ID and return the number of services that differ"""
+    file_handle.write("=== Controller Service Differences ===\n\n")
+    diff_count = 0
+
+    for cs_id in sorted(set(bad_cs) - set(good_cs)):
+        diff_count += 1
+        file_handle.write(f"  - Missing in Post-validation: {bad_cs[cs_id]['Name']} (ID: {cs_id})\n")
+    for cs_id in sorted(set(good_cs) - set(bad_cs)):
+        diff_count += 1
+        file_handle.write(f"  - New in Post-validation: {good_cs[cs_id]['Name']} (ID: {cs_id})\n")
+    if diff_count:
+        file_handle.write("\n")
+
+    for cs_id in sorted(set(good_cs) & set(bad_cs)):
+        good_data = good_cs[cs_id]
+        bad_data = bad_cs[cs_id]
+
+        differences = []
+        for field in sorted((set(good_data) | set(bad_data)) - {"properties", *BUNDLE_FIELDS}):
+            if good_data.get(field) != bad_data.get(field):
+                differences.append((field, good_data.get(field), bad_data.get(field)))
+        good_props = good_data["properties"]
+        bad_props = bad_data["properties"]
+        for key in sorted(set(good_props) | set(bad_props)):
+            if good_props.get(key) != bad_props.get(key):
+                differences.append((f"Property '{key}'", good_props.get(key), bad_props.get(key)))
+
+        if differences:
+            diff_count += 1
+            file_handle.write(f"Controller Service: {good_data['Name']} (ID: {cs_id})\n")
+            for field, good_val, bad_val in differences:
+                file_handle.write(f"    - {field}: Post-validation = {good_val} | Pre-validation = {bad_val}\n")
+            file_handle.write("\n")
+
+    if not diff_count:
+        file_handle.write("  ✅ No controller service differences found\n\n")
+
+    return diff_count
+
+def compare_connections(good_conns, bad_conns, file_handle):
+    """Diff connection topology and back-pressure configuration by ID and return the count"""
+    file_handle.write("=== Connection Differences ===\n\n")
+    diff_count = 0
+
+    for conn_id in sorted(set(bad_conns) - set(good_conns)):
+        diff_count += 1
+        file_handle.write(f"  - Missing in Post-validation: {bad_conns[conn_id]['Name']} (ID: {conn_id}) at {bad_conns[conn_id].get('Path')}\n")
+    for conn_id in sorted(set(good_conns) - set(bad_conns)):
+        diff_count += 1
+        file_handle.write(f"  - New in Post-validation: {good_conns[conn_id]['Name']} (ID: {conn_id}) at {good_conns[conn_id].get('Path')}\n")
+    if diff_count:
+        file_handle.write("\n")
+
+    for conn_id in sorted(set(good_conns) & set(bad_conns)):
+        good_data = good_conns[conn_id]
+        bad_data = bad_conns[conn_id]
+        differences = [(field, good_data.get(field), bad_data.get(field))
+                       for field in sorted(set(good_data) | set(bad_data))
+                       if field != "Name" and good_data.get(field) != bad_data.get(field)]
+        if differences:
+            diff_count += 1
+            file_handle.write(f"Connection: {good_data['Name']} (ID: {conn_id})\n")
+            for field, good_val, bad_val in differences:
+                file_handle.write(f"    - {field}: Post-validation = {good_val} | Pre-validation = {bad_val}\n")
+            file_handle.write("\n")
+
+    if not diff_count:
+        file_handle.write("  ✅ No connection differences found\n\n")
+
+    return diff_count
+
+def compare_processor_properties(good_props, bad_props, file_handle):
+    """Field-level diff of processor type and properties by processor ID; returns the number of processors that differ"""
+    file_handle.write("=== Processor Property Differences ===\n\n")
+    diff_count = 0
+
+    for proc_id in sorted(set(good_props) & set(bad_props)):
+        good_data = good_props[proc_id]
+        bad_data = bad_props[proc_id]
+        differences = [(field, good_data.get(field), bad_data.get(field))
+                       for field in sorted(set(good_data) | set(bad_data))
+                       if field not in ("Path", *BUNDLE_FIELDS) and good_data.get(field) != bad_data.get(field)]
+
+        if differences:
+            diff_count += 1
+            file_handle.write(f"Processor: {good_data['Name']} (ID: {proc_id})\n")
+            file_handle.write(f"  Path: {good_data.get('Path')}\n")
+            for field, good_val, bad_val in differences:
+                file_handle.write(f"    - {field}: Post-validation = {good_val} | Pre-validation = {bad_val}\n")
+            file_handle.write("\n")
+
+    if not diff_count:
+        file_handle.write("  ✅ No processor property differences found\n\n")
+
+    return diff_count
+
+def compare_bundles(good_components, bad_components, good_bundles, bad_bundles, file_handle):
+    """Report components whose bundle changed or became a ghost, and bundles the Post-validation no longer has;
+    returns (components with differences, bundles no longer installed)"""
+    file_handle.write("=== Extension Bundle Differences ===\n\n")
+    diff_count = 0
+
+    for component_id in sorted(good_components, key=lambda c: (good_components[c]["Kind"], good_components[c]["Name"], c)):
+        good_data = good_components[component_id]
+        bad_data = bad_components.get(component_id)
+        lines = []
+        if bad_data and bad_data["Bundle"] != good_data["Bundle"]:
+            lines.append(f"    - Bundle: Post-validation = {good_data['Bundle']} | Pre-validation = {bad_data['Bundle']}")
+        if good_data["Bundle Status"] == "Ghost" and (not bad_data or bad_data["Bundle Status"] != "Ghost"):
+            lines.append(f"    - ⚠️ Ghost in Post-validation: {good_data['Bundle']} is not installed")
+        if lines:
+            diff_count += 1
+            file_handle.write(f"{good_data['Kind']}: {good_data['Name']} (ID: {component_id})\n")
+            file_handle.write("\n".join(lines) + "\n\n")
+
+    # A bundle the flow used and had installed before the upgrade, with no installed version of its artifact
+    # afterwards; one that was already missing (a ghost) before was not removed by the upgrade
+    installed_artifacts = {coordinate.rsplit(":", 1)[0] for coordinate, fields in good_bundles.items()
+                           if fields.get("Installed") == "Yes"}
+    missing = []
+    if installed_artifacts:
+        missing = [coordinate for coordinate, fields in sorted(bad_bundles.items())
+                   if fields.get("Installed") == "Yes" and coordinate.rsplit(":", 1)[0] not in installed_artifacts
+                   and (fields.get("Processors", "0") != "0" or fields.get("Controller Services", "0") != "0")]
+    for coordinate in missing:
+        fields = bad_bundles[coordinate]
+        file_handle.write(f"  - Bundle no longer installed: {coordinate} (used by {fields.get('Processors', '0')} processor(s) "
+                          f"and {fields.get('Controller Services', '0')} controller service(s) in Pre-validation)\n")
+    if missing:
+        file_handle.write("\n")
+
+    if not diff_count and not missing:
+        file_handle.write("  ✅ No extension bundle differences found\n\n")
+
+    return diff_count, len(missing)
+
+def compare_health(good_health, bad_health, file_handle):
+    """Report bulletins and validation errors that are new in the Post-validation, returning the number of components"""
+    file_handle.write("=== Component Health (new since Pre-validation) ===\n\n")
+    issues = new_health_issues(good_health, bad_health)
+
+    for component_id, (name, messages, errors) in sorted(issues.items(), key=lambda i: (i[1][0], i[0])):
+        file_handle.write(f"Component: {name} (ID: {component_id})\n")
+        for error in errors:
+            file_handle.write(f"    - Validation Error: {error}\n")
+        for level, template in messages:
+            file_handle.write(f"    - Bulletin [{level}]: {template}\n")
+        file_handle.write("\n")
+
+    if not issues:
+        file_handle.write("  ✅ No new bulletins or validation errors\n\n")
+    return len(issues)
+
+def compare_runtime_status(good_status, bad_status, file_handle):
+    """Report processors whose run state or validity changed and queues that grew, returning the count"""
+    file_handle.write("=== Runtime Status Differences ===\n\n")
+    diff_count = 0
+
+    good_procs = good_status["processors"]
+    bad_procs = bad_status["processors"]
+    for proc_id in sorted(set(good_procs) & set(bad_procs)):
+        differences = []
+        for field in ("Run Status", "Validation Errors"):
+            if good_procs[proc_id].get(field) != bad_procs[proc_id].get(field):
+                differences.append((field, good_procs[proc_id].get(field), bad_procs[proc_id].get(field)))
+        if differences:
+            diff_count += 1
+            file_handle.write(f"Processor: {good_procs[proc_id]['Name']} (ID: {proc_id})\n")
+            for field, good_val, bad_val in differences:
+                file_handle.write(f"    - {field}: Post-validation = {good_val} | Pre-validation = {bad_val}\n")
+            file_handle.write("\n")
+
+    good_conns = good_status["connections"]
+    bad_conns = bad_status["connections"]
+    for conn_id in sorted(set(good_conns) & set(bad_conns)):
+        good_queued = int(good_conns[conn_id].get("Queued Count", 0))
+        bad_queued = int(bad_conns[conn_id].get("Queued Count", 0))
+        if good_queued > bad_queued:
+            diff_count += 1
+            file_handle.write(f"Connection: {good_conns[conn_id]['Name']} (ID: {conn_id})\n")
+            file_handle.write(f"    - Queued Count: Post-validation = {good_queued} | Pre-validation = {bad_queued}\n")
+            file_handle.write(f"    - Queued Bytes: Post-validation = {good_conns[conn_id].get('Queued Bytes')} | Pre-validation = {bad_conns[conn_id].get('Queued Bytes')}\n")
+            file_handle.write("\n")
+
+    if not diff_count:
+        file_handle.write("  ✅ No runtime status differences found\n\n")
+
+    return diff_count
+
 def list_files_with_prefix(directory, prefix):
     try:
         files = os.listdir(directory)
@@ -278,6 +551,152 @@ def debug_scheduling_info(scheduling_info, file_type):
             print()
     print("=" * 50)
 
+def load_report_pair(good_path, bad_path):
+    """Records of both reports within their common scope, without the contents of versioned groups that match;
+    returns (good records, bad records, scopes, matched versioned groups, versioned group differences)"""
+    good_snapshot, bad_snapshot = fresh_snapshot(good_path), fresh_snapshot(bad_path)
+    if good_snapshot and bad_snapshot:
+        # Root groups whose shard hashes match on both sides cannot differ, so only the others are loaded
+        good_records, bad_records = load_changed_shards(good_snapshot, bad_snapshot)
+    else:
+        good_records = list(parse_report_lines(read_file_as_list(good_path)))
+        bad_records = list(parse_report_lines(read_file_as_list(bad_path)))
+
+    # A scoped report only covers part of the flow: compare both sides within the same scope
+    scopes = [scope for scope in (read_scope(good_records), read_scope(bad_records)) if scope]
+    for scope in scopes:
+        good_records = filter_records_to_scope(good_records, scope)
+        bad_records = filter_records_to_scope(bad_records, scope)
+
+    # Versioned groups at the same registry version and up to date on both sides are equal by definition
+    skipped_paths, matched_versions, version_differences = match_versioned_groups(good_records, bad_records)
+    if skipped_paths:
+        good_records = drop_records_under(good_records, skipped_paths)
+        bad_records = drop_records_under(bad_records, skipped_paths)
+    return good_records, bad_records, scopes, matched_versions, version_differences
+
+def compare_reports(good_path, bad_path, report_path):
+    """Compare a Post-validation (good) report with a Pre-validation (bad) report, write the comparison and return the summary counts"""
+    good_records, bad_records, scopes, matched_versions, version_differences = load_report_pair(good_path, bad_path)
+
+    good_root, good_child, good_proc, good_param_names, good_param_kvs, good_sched, good_cs, good_status, good_conns, good_props = extract_components_from_records(good_records)
+    bad_root, bad_child, bad_proc, bad_param_names, bad_param_kvs, bad_sched, bad_cs, bad_status, bad_conns, bad_props = extract_components_from_records(bad_records)
+
+    # Debug output - uncomment these lines to see what's being parsed
+    # debug_scheduling_info(good_sched, "POST")
+    # debug_scheduling_info(bad_sched, "PRE")
+
+    # Components that came back under another ID or name are paired by structure, not reported as missing
+    changes, _, unpaired_good = match_reports(bad_records, good_records)
+    good_health, bad_health = extract_health(good_records), extract_health(bad_records)
+    good_bundle_components, good_bundles = extract_bundles(good_records)
+    bad_bundle_components, bad_bundles = extract_bundles(bad_records)
+    # Skipped detail shards leave a section without records, so its presence comes from the section markers
+    sections = extract_sections(good_records) | extract_sections(bad_records)
+    root_diff = drop_paired_names(compare_sets(good_root, bad_root), unpaired_good, "Process Group")
+    child_diff = drop_paired_names(compare_sets(good_child, bad_child), unpaired_good, "Process Group")
+    proc_diff = drop_paired_names(compare_sets(good_proc, bad_proc), unpaired_good, "Processor")
+    param_diff = compare_sets(good_param_names, bad_param_names)
+
+    with open(report_path, "w") as report_file:
+        report_file.write("=== NiFi Pre vs Post Environment Validation Report ===\n\n")
+        if scopes:
+            write_scope_note(scopes, report_file)
+        versioned_diff = 0
+        if matched_versions or version_differences:
+            versioned_diff = write_versioned_groups(matched_versions, version_differences, report_file)
+        if changes:
+            write_structural_changes(changes, report_file)
+        write_section(f"Total Root Process Groups difference: {len(root_diff)}", root_diff, report_file)
+        write_section(f"Total Child Process Groups difference: {len(child_diff)}", child_diff, report_file)
+        write_section(f"Total Processors difference: {len(proc_diff)}", proc_diff, report_file)
+        write_section(f"Total Parameter Contexts difference: {len(param_diff)}", param_diff, report_file)
+        compare_param_values(good_param_kvs, bad_param_kvs, report_file)
+        
+        # Scheduling period differences only
+        scheduling_period_diff = has_scheduling_period_differences(good_sched, bad_sched)
+        compare_scheduling_period_only(good_sched, bad_sched, report_file)
+
+        # Reports from older versions never captured these sections: leave them out rather than claim no differences
+        controller_service_diff = connection_diff = 0
+        if "controller_service" in sections:
+            controller_service_diff = compare_controller_services(good_cs, bad_cs, report_file)
+        if "connection" in sections:
+            connection_diff = compare_connections(good_conns, bad_conns, report_file)
+        processor_property_diff = 0
+        if "processor_properties" in sections:
+            processor_property_diff = compare_processor_properties(good_props, bad_props, report_file)
+        bundle_diff = missing_bundles = 0
+        if "bundle" in sections:
+            bundle_diff, missing_bundles = compare_bundles(good_bundle_components, bad_bundle_components,
+                                                           good_bundles, bad_bundles, report_file)
+        runtime_status_diff = 0
+        if "status" in sections:
+            runtime_status_diff = compare_runtime_status(good_status, bad_status, report_file)
+        health_diff = 0
+        if "health" in sections:
+            health_diff = compare_health(good_health, bad_health, report_file)
+        
+        # Summary section
+        report_file.write("=== Summary ===\n")
+        report_file.write(f"Root Process Groups missing: {len(root_diff)}\n")
+        report_file.write(f"Child Process Groups missing: {len(child_diff)}\n")
+        report_file.write(f"Processors missing: {len(proc_diff)}\n")
+        report_file.write(f"Parameter Contexts missing: {len(param_diff)}\n")
+        if "controller_service" in sections:
+            report_file.write(f"Controller Services with differences: {controller_service_diff}\n")
+        if "connection" in sections:
+            report_file.write(f"Connections with differences: {connection_diff}\n")
+        if "processor_properties" in sections:
+            report_file.write(f"Processors with property differences: {processor_property_diff}\n")
+        if "status" in sections:
+            report_file.write(f"Runtime Status differences: {runtime_status_diff}\n")
+        if "bundle" in sections:
+            report_file.write(f"Components with bundle differences: {bundle_diff}\n")
+            report_file.write(f"Bundles no longer installed: {missing_bundles}\n")
+        if "health" in sections:
+            report_file.write(f"Components with new bulletins or validation errors: {health_diff}\n")
+        if changes:
+            report_file.write(f"Renamed or recreated components: {len(changes)}\n")
+        if matched_versions or version_differences:
+            report_file.write(f"Versioned Groups with differences: {versioned_diff}\n")
+            report_file.write(f"Versioned Groups matched (contents not compared): {len(matched_versions)}\n")
+        if scheduling_period_diff:
+            report_file.write("⚠️ Scheduling Period differences found - see detailed sections above\n")
+        else:
+            report_file.write("✅ No Scheduling Period differences found\n")
+
+    return {
+        "Root Process Groups missing": len(root_diff),
+        "Child Process Groups missing": len(child_diff),
+        "Processors missing": len(proc_diff),
+        "Parameter Contexts missing": len(param_diff),
+        "Controller Services with differences": controller_service_diff,
+        "Connections with differences": connection_diff,
+        "Processors with property differences": processor_property_diff,
+        "Runtime Status differences": runtime_status_diff,
+        "Renamed or recreated components": len(changes),
+        "Components with new bulletins or validation errors": health_diff,
+        "Components with bundle differences": bundle_diff,
+        "Bundles no longer installed": missing_bundles,
+        "Versioned Groups with differences": versioned_diff,
+        "Scheduling Period differences": scheduling_period_diff
+    }
+
+def cached_compare_reports(good_path, bad_path, report_path):
+    """compare_reports through the on-disk result cache; returns (summary, True when the cached result was reused)"""
+    # Every module that shapes the result is part of the key, so a code change never serves a stale comparison
+    code = [file_digest(path) for path in (__file__, Snapshot.__file__, Structural_Match.__file__)]
+    options = {"compare": "report", "code": code}
+    key = cache_key([good_path, bad_path], options)
+    meta = restore(key, report_path)
+    if meta is not None:
+        return meta["summary"], True
+
+    summary = compare_reports(good_path, bad_path, report_path)
+    store(key, report_path, {"summary": summary})
+    return summary, False
+
 def main():
     print("=== NiFi Pre vs Post Environment Comparison ===\n")
 
@@ -294,47 +713,14 @@ def main():
         return
 
     try:
-        good_lines = read_file_as_list(os.path.join(reports_dir, good_file))
-        bad_lines = read_file_as_list(os.path.join(reports_dir, bad_file))
-
-        good_root, good_child, good_proc, good_param_names, good_param_kvs, good_sched = extract_all_components(good_lines)
-        bad_root, bad_child, bad_proc, bad_param_names, bad_param_kvs, bad_sched = extract_all_components(bad_lines)
-
-        # Debug output - uncomment these lines to see what's being parsed
-        # debug_scheduling_info(good_sched, "POST")
-        # debug_scheduling_info(bad_sched, "PRE")
-
-        root_diff = compare_sets(good_root, bad_root)
-        child_diff = compare_sets(good_child, bad_child)
-        proc_diff = compare_sets(good_proc, bad_proc)
-        param_diff = compare_sets(good_param_names, bad_param_names)
-
         report_path = os.path.join(reports_dir, "comparison_report.txt")
-        with open(report_path, "w") as report_file:
-            report_file.write("=== NiFi Pre vs Post Environment Validation Report ===\n\n")
-            write_section(f"Total Root Process Groups difference: {len(root_diff)}", root_diff, report_file)
-            write_section(f"Total Child Process Groups difference: {len(child_diff)}", child_diff, report_file)
-            write_section(f"Total Processors difference: {len(proc_diff)}", proc_diff, report_file)
-            write_section(f"Total Parameter Contexts difference: {len(param_diff)}", param_diff, report_file)
-            compare_param_values(good_param_kvs, bad_param_kvs, report_file)
-            
-            # Scheduling period differences only
-            scheduling_period_diff = has_scheduling_period_differences(good_sched, bad_sched)
-            compare_scheduling_period_only(good_sched, bad_sched, report_file)
-            
-            # Summary section
-            report_file.write("=== Summary ===\n")
-            report_file.write(f"Root Process Groups missing: {len(root_diff)}\n")
-            report_file.write(f"Child Process Groups missing: {len(child_diff)}\n")
-            report_file.write(f"Processors missing: {len(proc_diff)}\n")
-            report_file.write(f"Parameter Contexts missing: {len(param_diff)}\n")
-            if scheduling_period_diff:
-                report_file.write("⚠️ Scheduling Period differences found - see detailed sections above\n")
-            else:
-                report_file.write("✅ No Scheduling Period differences found\n")
+        _, reused = cached_compare_reports(os.path.join(reports_dir, good_file), os.path.join(reports_dir, bad_file), report_path)
 
-        print("Comparing Reports .....")
-        time.sleep(3)
+        if reused:
+            print("♻️ Same Pre/Post pair as an earlier run, reusing its comparison")
+        else:
+            print("Comparing Reports .....")
+            time.sleep(3)
         print("\n✅ Comparison completed successfully")
         print(f"📄 Report saved to '{report_path}'")
 
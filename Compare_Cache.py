@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+import shutil
+
+####### On-disk cache of comparison results
+# A result is keyed by the content of the compared files and the compare options (which include
+# the compare code itself), so a repeated comparison of the same pair is a file copy.
+
+CACHE_DIR = os.path.join("Reports", "compare_cache")
+CACHE_MAX_ENTRIES = 100
+CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def cache_key(input_paths, options):
+    """Key a comparison by the content of its inputs, in order, and its options"""
+    payload = {"inputs": [file_digest(path) for path in input_paths], "options": options}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+def restore(key, output_path):
+    """Copy a cached result to output_path and return its metadata, or None when it is not cached"""
+    result_path = os.path.join(CACHE_DIR, f"{key}.txt")
+    meta_path = os.path.join(CACHE_DIR, f"{key}.json")
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        shutil.copyfile(result_path, output_path)
+        # Touch both files so eviction sees them as recently used
+        os.utime(result_path)
+        os.utime(meta_path)
+    except (FileNotFoundError, ValueError):
+        return None
+    return meta
+
+def store(key, output_path, meta=None):
+    """Cache a freshly written result, then evict the least recently used results beyond the limits"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    suffix = f".{os.getpid()}.tmp"
+    result_path = os.path.join(CACHE_DIR, f"{key}.txt")
+    meta_path = os.path.join(CACHE_DIR, f"{key}.json")
+
+    shutil.copyfile(output_path, result_path + suffix)
+    with open(meta_path + suffix, "w", encoding="utf-8") as f:
+        json.dump(meta or {}, f)
+    # Publish the result before its metadata: a reader only trusts entries whose metadata exists
+    os.replace(result_path + suffix, result_path)
+    os.replace(meta_path + suffix, meta_path)
+    evict()
+
+def evict(max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".json"):
+            continue
+        key = name[:-len(".json")]
+        try:
+            meta_path = os.path.join(CACHE_DIR, name)
+            result_path = os.path.join(CACHE_DIR, f"{key}.txt")
+            size = os.path.getsize(meta_path) + os.path.getsize(result_path)
+            entries.append((os.path.getmtime(meta_path), key, size))
+        except FileNotFoundError:
+            continue
+
+    total = 0
+    for index, (_, key, size) in enumerate(sorted(entries, reverse=True)):
+        total += size
+        if index < max_entries and total <= max_bytes:
+            continue
+        for extension in (".json", ".txt"):
+            try:
+                os.remove(os.path.join(CACHE_DIR, key + extension))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,156 @@
+import os
+import sys
+import json
+import time
+import datetime
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+
+# Clusters come from the inventory, so skip the single-cluster kubectl lookup PreInfo/PostInfo do on import
+os.environ["NIFI_FLEET_WORKER"] = "1"
+
+import PreInfo
+import PostInfo
+from Compare import cached_compare_reports, list_files_with_prefix
+from Snapshot import parse_report_lines, snapshot_path_for, write_snapshot
+
+INVENTORY_FILE = "clusters.json"
+FLEET_REPORTS_DIR = os.path.join("Reports", "fleet")
+FLEET_WORKERS = 16
+
+MODES = {
+    "1": ("pre", "Pre-validation"),
+    "2": ("post", "Post-validation"),
+    "3": ("compare", "Comparison of latest Pre vs Post"),
+    "4": ("post_compare", "Post-validation + Comparison"),
+}
+
+def load_inventory(path):
+    """Read the cluster inventory: a JSON list of {name, context, namespace | api_ip, host_ip, [username, password]}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        clusters = json.load(f)
+
+    names = set()
+    for cluster in clusters:
+        if not cluster.get("name"):
+            raise Exception(f"Inventory entry without a name: {cluster}")
+        if cluster["name"] in names:
+            raise Exception(f"Duplicate cluster name in inventory: {cluster['name']}")
+        names.add(cluster["name"])
+    return clusters
+
+def latest_report(reports_dir, prefix):
+    files = list_files_with_prefix(reports_dir, prefix)
+    if not files:
+        return None
+    return max((os.path.join(reports_dir, f) for f in files), key=os.path.getmtime)
+
+def configure_module(module, cluster):
+    """Resolve the cluster endpoints (explicit IPs or kubectl context/namespace) and point the module at them"""
+    api_ip = cluster.get("api_ip") or module.get_nifi_api_ip(cluster.get("context"), cluster.get("namespace"))
+    host_ip = cluster.get("host_ip") or module.get_nifi_host_ip(cluster.get("context"), cluster.get("namespace"))
+    if not api_ip or not host_ip:
+        raise Exception("Could not resolve NiFi API/host IP for this cluster")
+    module.configure_cluster(api_ip, host_ip, cluster.get("username"), cluster.get("password"))
+
+def capture_cluster(module, cluster, reports_dir):
+    configure_module(module, cluster)
+    token = module.get_token()
+    output_lines, execute_sql_data = module.build_report(token)
+    report_path = module.save_output_to_file("\n".join(output_lines), reports_dir=reports_dir)
+    write_snapshot(parse_report_lines("\n".join(output_lines).split("\n")), snapshot_path_for(report_path), workers=1)
+    module.save_detailed_execute_sql(execute_sql_data, reports_dir=reports_dir)
+    return report_path
+
+def run_cluster(cluster, mode):
+    """Capture and/or compare one cluster inside its own worker process; failures are returned, never raised"""
+    started = time.time()
+    reports_dir = os.path.join(FLEET_REPORTS_DIR, cluster["name"])
+    result = {"name": cluster["name"], "status": "OK", "error": "", "summary": None, "report": None}
+
+    try:
+        os.makedirs(reports_dir, exist_ok=True)
+        with open(os.path.join(reports_dir, "fleet.log"), "a", encoding="utf-8") as log, redirect_stdout(log):
+            print(f"=== {datetime.datetime.now().isoformat(timespec='seconds')} mode={mode} ===")
+            if mode == "pre":
+                result["report"] = capture_cluster(PreInfo, cluster, reports_dir)
+            if mode in ("post", "post_compare"):
+                result["report"] = capture_cluster(PostInfo, cluster, reports_dir)
+            if mode in ("compare", "post_compare"):
+                good_file = latest_report(reports_dir, "Nifi_Post_Validation_Report_")
+                bad_file = latest_report(reports_dir, "Nifi_Pre_Validation_Report_")
+                if not good_file or not bad_file:
+                    raise Exception("Both a Pre-validation and a Post-validation report are needed to compare")
+                result["report"] = os.path.join(reports_dir, "comparison_report.txt")
+                result["summary"], _ = cached_compare_reports(good_file, bad_file, result["report"])
+    except Exception as e:
+        result["status"] = "FAILED"
+        result["error"] = str(e)
+
+    result["duration"] = round(time.time() - started, 1)
+    return result
+
+def write_fleet_summary(results, mode_label, wall_time):
+    os.makedirs(FLEET_REPORTS_DIR, exist_ok=True)
+    suffix = datetime.datetime.now().strftime("%d%m%Y_%H-%M-%S")
+    summary_path = os.path.join(FLEET_REPORTS_DIR, f"fleet_summary_{suffix}.txt")
+    failed = [r for r in results if r["status"] != "OK"]
+
+    with open(summary_path, "w", encoding="utf-8") as f:
+        f.write(f"=== NiFi Fleet Validation Summary ({mode_label}) ===\n\n")
+        f.write(f"Clusters: {len(results)} | OK: {len(results) - len(failed)} | Failed: {len(failed)} | Wall time: {wall_time:.1f}s\n\n")
+        for result in results:
+            f.write(f"Cluster: {result['name']}\n")
+            f.write(f"  Status   : {result['status']} ({result['duration']}s)\n")
+            if result["error"]:
+                f.write(f"  Error    : {result['error']}\n")
+            for label, value in (result["summary"] or {}).items():
+                f.write(f"  {label}: {value}\n")
+            if result["report"]:
+                f.write(f"  Report   : {result['report']}\n")
+            f.write("-" * 60 + "\n")
+    return summary_path
+
+def main():
+    print("=== NiFi Fleet Pre/Post Validation ===\n")
+
+    inventory_path = input(f"Inventory file (default {INVENTORY_FILE}): ").strip() or INVENTORY_FILE
+    try:
+        clusters = load_inventory(inventory_path)
+    except FileNotFoundError:
+        print(f"❌ Inventory file not found: {inventory_path}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ Invalid inventory: {e}")
+        sys.exit(1)
+
+    print("\nPlease choose the fleet activity:")
+    for key, (_, label) in MODES.items():
+        print(f"    {key}) {label}")
+    choice = input(f"Enter your choice (1-{len(MODES)}): ").strip()
+    if choice not in MODES:
+        print("❌ Invalid choice. Please enter valid number")
+        sys.exit(1)
+    mode, mode_label = MODES[choice]
+
+    print(f"\n➡️ Running {mode_label} on {len(clusters)} cluster(s) .....")
+    started = time.time()
+    with ProcessPoolExecutor(max_workers=max(1, min(FLEET_WORKERS, len(clusters)))) as executor:
+        futures = [executor.submit(run_cluster, cluster, mode) for cluster in clusters]
+        results = []
+        for cluster, future in zip(clusters, futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker process itself died; keep the rest of the fleet going
+                result = {"name": cluster["name"], "status": "FAILED", "error": str(e),
+                          "summary": None, "report": None, "duration": 0}
+            icon = "✅" if result["status"] == "OK" else "❌"
+            print(f"{icon} {result['name']}: {result['status']} ({result['duration']}s) {result['error']}")
+            results.append(result)
+
+    summary_path = write_fleet_summary(results, mode_label, time.time() - started)
+    print(f"\n📄 Fleet summary saved to '{summary_path}'")
+
+if __name__ == "__main__":
+    main()
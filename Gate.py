@@ -0,0 +1,236 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from Compare import (BUNDLE_FIELDS, cached_compare_reports, ensure_reports_directory, extract_bundles,
+                     extract_components_from_records, extract_health, list_files_with_prefix, load_report_pair,
+                     new_health_issues)
+from Structural_Match import match_reports
+
+####### Gate mode for pipelines
+# Runs severity-ranked checks over the latest (or given) Post/Pre reports, stops at the first fatal
+# finding, prints a one-line JSON verdict and exits with a code a pipeline can branch on.
+
+RULES_FILE = "gate_rules.json"
+SEVERITIES = ("fatal", "warning", "ignore")
+MAX_ITEMS = 10
+
+EXIT_PASS = 0
+EXIT_WARNING = 1
+EXIT_FATAL = 2
+EXIT_ERROR = 3
+
+# Checks run in this order; override any severity in gate_rules.json, e.g. {"scheduling_period_changed": "fatal"}
+DEFAULT_RULES = {
+    "root_process_groups_missing": "fatal",
+    "child_process_groups_missing": "fatal",
+    "processors_missing": "fatal",
+    "controller_services_missing": "fatal",
+    "parameter_contexts_missing": "fatal",
+    "connections_missing": "fatal",
+    "processors_invalid": "fatal",
+    "ghost_components": "fatal",
+    "controller_services_disabled": "fatal",
+    "new_error_bulletins": "warning",
+    "parameter_values_changed": "warning",
+    "controller_services_changed": "warning",
+    "connections_changed": "warning",
+    "processor_properties_changed": "warning",
+    "scheduling_period_changed": "warning",
+    "versioned_groups_changed": "warning",
+    "renamed_or_recreated": "warning",
+    "bundles_changed": "ignore",
+}
+
+def load_rules(path):
+    """Default severities overridden by the rules file, when there is one"""
+    rules = dict(DEFAULT_RULES)
+    if not os.path.exists(path):
+        return rules
+    with open(path, "r", encoding="utf-8") as f:
+        overrides = json.load(f)
+    for check, severity in overrides.items():
+        if check not in DEFAULT_RULES:
+            raise Exception(f"Unknown gate check in {path}: {check}")
+        if severity not in SEVERITIES:
+            raise Exception(f"Invalid severity for {check} in {path}: {severity} (expected one of {', '.join(SEVERITIES)})")
+        rules[check] = severity
+    return rules
+
+class GateInputs:
+    """Both reports' components, extracted once and shared by every check"""
+    def __init__(self, good_records, bad_records, version_differences):
+        self.good_records = good_records
+        self.bad_records = bad_records
+        self.version_differences = version_differences
+        (self.good_root, self.good_child, self.good_proc, self.good_params, self.good_param_kvs, self.good_sched,
+         self.good_cs, self.good_status, self.good_conns, self.good_props) = extract_components_from_records(good_records)
+        (self.bad_root, self.bad_child, self.bad_proc, self.bad_params, self.bad_param_kvs, self.bad_sched,
+         self.bad_cs, self.bad_status, self.bad_conns, self.bad_props) = extract_components_from_records(bad_records)
+        self._match = None
+        self._bundles = None
+
+    def match(self):
+        """(structural changes, unpaired (kind, name) in the Pre-validation, unpaired in the Post-validation)"""
+        if self._match is None:
+            self._match = match_reports(self.bad_records, self.good_records)
+        return self._match
+
+    def structural(self):
+        return self.match()[0]
+
+    def bundles(self):
+        if self._bundles is None:
+            self._bundles = (extract_bundles(self.good_records), extract_bundles(self.bad_records))
+        return self._bundles
+
+def missing_names(good_names, bad_names, inputs, kind):
+    """Names in the Pre-validation report that the Post-validation lacks, unless every component with the name
+    was renamed or recreated"""
+    missing = bad_names - good_names
+    if missing:
+        _, unpaired_bad, _ = inputs.match()
+        missing = {name for name in missing if (kind, name) in unpaired_bad}
+    return sorted(missing)
+
+def changed_ids(good, bad, ignored_fields=()):
+    return [f"{good[component_id].get('Name')} (ID: {component_id})" for component_id in sorted(set(good) & set(bad))
+            if {k: v for k, v in good[component_id].items() if k not in ignored_fields}
+            != {k: v for k, v in bad[component_id].items() if k not in ignored_fields}]
+
+def check_processors_invalid(inputs):
+    good, bad = inputs.good_status["processors"], inputs.bad_status["processors"]
+    return [f"{good[proc_id]['Name']} (ID: {proc_id})" for proc_id in sorted(good)
+            if good[proc_id].get("Run Status") == "Invalid" and bad.get(proc_id, {}).get("Run Status") != "Invalid"]
+
+def check_ghost_components(inputs):
+    (good_components, _), (bad_components, _) = inputs.bundles()
+    return [f"{data['Name']} (ID: {component_id})" for component_id, data in sorted(good_components.items())
+            if data["Bundle Status"] == "Ghost" and bad_components.get(component_id, {}).get("Bundle Status") != "Ghost"]
+
+def check_bundles_changed(inputs):
+    (good_components, _), (bad_components, _) = inputs.bundles()
+    return [f"{data['Name']} (ID: {component_id})" for component_id, data in sorted(good_components.items())
+            if component_id in bad_components and bad_components[component_id]["Bundle"] != data["Bundle"]]
+
+def check_new_error_bulletins(inputs):
+    issues = new_health_issues(extract_health(inputs.good_records), extract_health(inputs.bad_records))
+    return [f"{name} (ID: {component_id})" for component_id, (name, messages, errors) in sorted(issues.items())
+            if errors or any(level == "ERROR" for level, _ in messages)]
+
+def check_parameter_values_changed(inputs):
+    return [f"{context} / {name}" for context in sorted(set(inputs.good_param_kvs) & set(inputs.bad_param_kvs))
+            for name in sorted(set(inputs.good_param_kvs[context]) & set(inputs.bad_param_kvs[context]))
+            if inputs.good_param_kvs[context][name] != inputs.bad_param_kvs[context][name]]
+
+def check_scheduling_period_changed(inputs):
+    items = []
+    for path in sorted(set(inputs.good_sched) & set(inputs.bad_sched)):
+        for proc in sorted(set(inputs.good_sched[path]) & set(inputs.bad_sched[path]), key=str):
+            good_period = inputs.good_sched[path][proc].get("Scheduling Period")
+            bad_period = inputs.bad_sched[path][proc].get("Scheduling Period")
+            if good_period and bad_period and good_period != bad_period:
+                items.append(f"{path} > {proc}")
+    return items
+
+CHECKS = {
+    "root_process_groups_missing": lambda i: missing_names(i.good_root, i.bad_root, i, "Process Group"),
+    "child_process_groups_missing": lambda i: missing_names(i.good_child, i.bad_child, i, "Process Group"),
+    "processors_missing": lambda i: missing_names(i.good_proc, i.bad_proc, i, "Processor"),
+    "controller_services_missing": lambda i: [f"{i.bad_cs[cs_id]['Name']} (ID: {cs_id})" for cs_id in sorted(set(i.bad_cs) - set(i.good_cs))],
+    "parameter_contexts_missing": lambda i: sorted(i.bad_params - i.good_params),
+    "connections_missing": lambda i: [f"{i.bad_conns[conn_id]['Name']} (ID: {conn_id})" for conn_id in sorted(set(i.bad_conns) - set(i.good_conns))],
+    "processors_invalid": check_processors_invalid,
+    "ghost_components": check_ghost_components,
+    "controller_services_disabled": lambda i: [f"{i.good_cs[cs_id]['Name']} (ID: {cs_id})" for cs_id in sorted(set(i.good_cs) & set(i.bad_cs))
+                                               if i.bad_cs[cs_id].get("State") == "ENABLED" and i.good_cs[cs_id].get("State") != "ENABLED"],
+    "new_error_bulletins": check_new_error_bulletins,
+    "parameter_values_changed": check_parameter_values_changed,
+    "controller_services_changed": lambda i: changed_ids(i.good_cs, i.bad_cs, BUNDLE_FIELDS),
+    "connections_changed": lambda i: changed_ids(i.good_conns, i.bad_conns, ("Name",)),
+    "processor_properties_changed": lambda i: changed_ids(i.good_props, i.bad_props, ("Path", *BUNDLE_FIELDS)),
+    "scheduling_period_changed": check_scheduling_period_changed,
+    "versioned_groups_changed": lambda i: [path for path, _, _ in i.version_differences],
+    "renamed_or_recreated": lambda i: [f"{kind}: {bad_node['Name']} (ID: {bad_node['ID']}) -> {good_node['Name']} (ID: {good_node['ID']})"
+                                       for kind, bad_node, good_node, _ in i.structural()],
+    "bundles_changed": check_bundles_changed,
+}
+
+def run_gate(good_path, bad_path, rules, stop_at_fatal=True):
+    """Run the checks in rule order; returns (findings, number of checks run, True when stopped early)"""
+    good_records, bad_records, _, _, version_differences = load_report_pair(good_path, bad_path)
+    inputs = GateInputs(good_records, bad_records, version_differences)
+    findings = []
+    checks_run = 0
+
+    # Ignored checks are never evaluated, and fatal ones go first so the gate can stop as soon as one fires
+    ordered = [check for check in DEFAULT_RULES if rules[check] == "fatal"] + \
+              [check for check in DEFAULT_RULES if rules[check] == "warning"]
+    for check in ordered:
+        checks_run += 1
+        items = CHECKS[check](inputs)
+        if items:
+            findings.append({"check": check, "severity": rules[check], "count": len(items), "items": items[:MAX_ITEMS]})
+            if stop_at_fatal and rules[check] == "fatal":
+                return findings, checks_run, checks_run < len(ordered)
+    return findings, checks_run, False
+
+def verdict_of(findings):
+    severities = {finding["severity"] for finding in findings}
+    if "fatal" in severities:
+        return "fail", EXIT_FATAL
+    if "warning" in severities:
+        return "warn", EXIT_WARNING
+    return "pass", EXIT_PASS
+
+def latest_report(reports_dir, prefix):
+    files = list_files_with_prefix(reports_dir, prefix)
+    if not files:
+        return None
+    return max((os.path.join(reports_dir, f) for f in files), key=os.path.getmtime)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pass/fail gate on a Post-validation report against a Pre-validation report")
+    parser.add_argument("--post", help="Post-validation report (default: latest in Reports/)")
+    parser.add_argument("--pre", help="Pre-validation report (default: latest in Reports/)")
+    parser.add_argument("--rules", default=RULES_FILE, help=f"JSON severity overrides (default: {RULES_FILE} when present)")
+    parser.add_argument("--all", action="store_true", help="Run every check instead of stopping at the first fatal finding")
+    parser.add_argument("--report", metavar="PATH", help="Also write the full comparison report to PATH")
+    parser.add_argument("--verdict", metavar="PATH", help="Also write the JSON verdict to PATH")
+    args = parser.parse_args(argv)
+
+    started = time.time()
+    verdict = {"verdict": "error", "post": args.post, "pre": args.pre}
+    exit_code = EXIT_ERROR
+    try:
+        rules = load_rules(args.rules)
+        reports_dir = ensure_reports_directory()
+        good_file = args.post or latest_report(reports_dir, "Nifi_Post_Validation_Report_")
+        bad_file = args.pre or latest_report(reports_dir, "Nifi_Pre_Validation_Report_")
+        if not good_file or not bad_file:
+            raise Exception("Both a Pre-validation and a Post-validation report are needed")
+        verdict.update(post=good_file, pre=bad_file)
+
+        findings, checks_run, stopped_early = run_gate(good_file, bad_file, rules, stop_at_fatal=not args.all)
+        verdict["verdict"], exit_code = verdict_of(findings)
+        verdict.update(checks_run=checks_run, stopped_early=stopped_early, findings=findings)
+
+        if args.report:
+            cached_compare_reports(good_file, bad_file, args.report)
+            verdict["report"] = args.report
+    except Exception as e:
+        verdict["error"] = str(e)
+        exit_code = EXIT_ERROR
+
+    verdict["duration"] = round(time.time() - started, 2)
+    line = json.dumps(verdict, sort_keys=True)
+    print(line)
+    if args.verdict:
+        with open(args.verdict, "w", encoding="utf-8") as f:
+            f.write(line + "\n")
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import datetime
+import hashlib
+import json
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import PreInfo
+from Compare import ensure_reports_directory
+
+NODE_WORKERS = 16
+
+def node_state(status):
+    """The parts of a node's status that must agree across the cluster (queues and threads legitimately differ)"""
+    return {
+        'processors': {p['id']: {'Name': p['name'], 'Group': p['group_id'], 'Run Status': p['run_status']}
+                       for p in status['processors']},
+        'connections': {c['id']: {'Source': c['source_name'], 'Destination': c['destination_name']}
+                        for c in status['connections']}
+    }
+
+def check_node(token, node):
+    """Fetch one node's own status through the coordinator and hash it; errors are returned, never raised"""
+    result = {**node, 'hash': None, 'state': None, 'error': ''}
+    try:
+        status = PreInfo.flatten_status(PreInfo.get_flow_status(token, cluster_node_id=node['id']))
+        result['state'] = node_state(status)
+        result['hash'] = hashlib.sha256(json.dumps(result['state'], sort_keys=True).encode("utf-8")).hexdigest()
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+def diff_node_state(reference, state):
+    """List the component differences of one node against the reference node"""
+    lines = []
+    for kind, label in (('processors', 'Processor'), ('connections', 'Connection')):
+        expected, actual = reference[kind], state[kind]
+        for comp_id in sorted(set(expected) | set(actual)):
+            if comp_id not in actual:
+                lines.append(f"  ❌ {label} missing on this node: {expected[comp_id].get('Name', comp_id)} (ID: {comp_id})")
+            elif comp_id not in expected:
+                lines.append(f"  ➕ {label} only on this node: {actual[comp_id].get('Name', comp_id)} (ID: {comp_id})")
+            else:
+                for field in sorted(set(expected[comp_id]) | set(actual[comp_id])):
+                    if expected[comp_id].get(field) != actual[comp_id].get(field):
+                        lines.append(f"  ⚠️ {label} {actual[comp_id].get('Name', comp_id)} (ID: {comp_id}) {field}: "
+                                     f"Reference = {expected[comp_id].get(field)} | This node = {actual[comp_id].get(field)}")
+    return lines
+
+def write_node_report(results, report_path):
+    hashes = Counter(r['hash'] for r in results if r['hash'])
+    reference_hash = hashes.most_common(1)[0][0] if hashes else None
+    reference = next((r for r in results if r['hash'] == reference_hash), None)
+    divergent = [r for r in results if r['hash'] != reference_hash]
+
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write("=== NiFi Cluster Node Consistency Report ===\n\n")
+        f.write(f"Nodes: {len(results)} | Consistent: {len(results) - len(divergent)} | Divergent or unreachable: {len(divergent)}\n")
+        if reference:
+            f.write(f"Reference node (majority state): {reference['address']} (ID: {reference['id']})\n")
+        f.write("\n")
+
+        for r in results:
+            icon = "✅" if r['hash'] == reference_hash else "❌"
+            f.write(f"{icon} Node: {r['address']} (ID: {r['id']})\n")
+            f.write(f"  Status        : {r['status']}\n")
+            f.write(f"  Roles         : {', '.join(r['roles']) or 'None'}\n")
+            f.write(f"  Active Threads: {r['active_threads']}\n")
+            f.write(f"  Queued        : {r['queued']}\n")
+            f.write(f"  State Hash    : {r['hash'][:12] if r['hash'] else 'N/A'}\n")
+            if r['error']:
+                f.write(f"  Error         : {r['error']}\n")
+            elif r['hash'] != reference_hash:
+                f.writelines(line + "\n" for line in diff_node_state(reference['state'], r['state']))
+            f.write("-" * 60 + "\n")
+
+        f.write("\n=== Summary ===\n")
+        if not divergent:
+            f.write("✅ All nodes report the same flow and runtime state\n")
+        for r in divergent:
+            f.write(f"❌ {r['address']}: {'unreachable - ' + r['error'] if r['error'] else 'state differs from the reference node'}\n")
+    return divergent
+
+def main():
+    print("=== NiFi Cluster Node Consistency Check ===\n")
+    try:
+        token = PreInfo.get_token()
+        nodes = PreInfo.get_cluster_nodes(token)
+        if not nodes:
+            print("➡️ NiFi is not clustered, nothing to compare.")
+            return
+
+        print(f"➡️ Checking {len(nodes)} node(s) .....")
+        with ThreadPoolExecutor(max_workers=max(1, min(NODE_WORKERS, len(nodes)))) as executor:
+            results = list(executor.map(lambda node: check_node(token, node), nodes))
+
+        reports_dir = ensure_reports_directory()
+        suffix = datetime.datetime.now().strftime("%d%m%Y_%H-%M-%S")
+        report_path = os.path.join(reports_dir, f"node_consistency_report_{suffix}.txt")
+        divergent = write_node_report(results, report_path)
+
+        if divergent:
+            print(f"\n❌ {len(divergent)} node(s) differ from the cluster majority")
+        else:
+            print("\n✅ All nodes are consistent")
+        print(f"📄 Report saved to '{report_path}'")
+
+    except Exception as e:
+        print(f"❌ Error while checking cluster nodes: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -8,13 +8,32 @@ import os
 import subprocess
 import re
 import time
+import hashlib
+import json
+import fnmatch
+import glob
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import Cassette
+from Precheck import (BASELINE_REPORT_PREFIX, baseline_detailed_report, changed_root_groups, latest_baseline,
+                      save_fingerprints)
+from Snapshot import parse_report_lines, snapshot_path_for, write_snapshot
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 ####### Gether Nifi Info
-def get_nifi_host_ip():
+def kubectl_command(context=None, namespace=None):
+    command = "kubectl"
+    if context:
+        command += f" --context {context}"
+    if namespace:
+        command += f" -n {namespace}"
+    return command
+
+def get_nifi_host_ip(context=None, namespace=None):
     try:
-        result = subprocess.check_output("kubectl get pod -o wide | grep nifi", shell=True, text=True)
+        result = subprocess.check_output(f"{kubectl_command(context, namespace)} get pod -o wide | grep nifi", shell=True, text=True)
         # IP is usually in the 6th column (e.g., 10.233.85.23)
         ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', result)
         return ip_match.group(1) if ip_match else None
@@ -22,9 +41,9 @@ def get_nifi_host_ip():
         print("Error fetching Nifi pod info:", e)
         return None
 
-def get_nifi_api_ip():
+def get_nifi_api_ip(context=None, namespace=None):
     try:
-        result = subprocess.check_output("kubectl get ep | grep kuberiq-vip", shell=True, text=True)
+        result = subprocess.check_output(f"{kubectl_command(context, namespace)} get ep | grep kuberiq-vip", shell=True, text=True)
         # Extract the IP from the endpoint info (e.g., 172.29.144.169:80)
         ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+):\d+', result)
         return ip_match.group(1) if ip_match else None
@@ -32,9 +51,12 @@ def get_nifi_api_ip():
         print("Error fetching Nifi API endpoint:", e)
         return None
 
-# Get the IPs
-Nifi_Host = get_nifi_host_ip()
-Nifi_Api = get_nifi_api_ip()
+# Get the IPs (fleet workers skip this and call configure_cluster() per cluster instead; a replay needs no cluster)
+if os.environ.get("NIFI_FLEET_WORKER") or Cassette.replaying():
+    Nifi_Host = Nifi_Api = None
+else:
+    Nifi_Host = get_nifi_host_ip()
+    Nifi_Api = get_nifi_api_ip()
 
 #print("Nifi_Host:", Nifi_Host)
 #print("Nifi_Api:", Nifi_Api)
@@ -44,13 +66,45 @@ Nifi_Api = get_nifi_api_ip()
 
 nifi_api_host = f"https://{Nifi_Api}"
 token_url = f"http://{Nifi_Host}:8080/nifi-api/access/token"
-username = "radcom"
-password = "Radmin@12345"
+DEFAULT_USERNAME = "radcom"
+DEFAULT_PASSWORD = "Radmin@12345"
+username = DEFAULT_USERNAME
+password = DEFAULT_PASSWORD
+CRAWL_WORKERS = 8
+REPORT_PREFIX = "Nifi_Pre_Validation_Report_"
+PROPERTY_SCHEMAS = {}
+# requests itself, or a record/replay cassette around it (NIFI_RECORD / NIFI_REPLAY, single-cluster runs only)
+http = requests if os.environ.get("NIFI_FLEET_WORKER") else Cassette.transport_from_env(requests)
+# The bulletin board returns the newest bulletins first and cannot page back past its limit
+BULLETIN_LIMIT = 5000
+BULLETIN_LEVELS = {"DEBUG": 0, "INFO": 1, "WARNING": 2, "WARN": 2, "ERROR": 3}
+# Variable parts of bulletin messages, so repeats of the same message collapse into one template
+MESSAGE_VARIABLES = [
+    (re.compile(r"StandardFlowFileRecord\[[^\]]*\]"), "<flowfile>"),
+    (re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"), "<id>"),
+    (re.compile(r"\b\d+\b"), "<n>"),
+]
+PRECHECK_GROUP_COUNTS = ("runningCount", "stoppedCount", "invalidCount", "disabledCount",
+                         "activeRemotePortCount", "inactiveRemotePortCount", "inputPortCount", "outputPortCount")
+
+def configure_cluster(api_ip, host_ip, user=None, secret=None):
+    """Point every API helper in this module at another cluster
+
+    Credentials fall back to the defaults on every call: a fleet worker process is reused across
+    clusters, so nothing from the previous cluster may carry over.
+    """
+    global Nifi_Host, Nifi_Api, nifi_api_host, token_url, username, password
+    Nifi_Host = host_ip
+    Nifi_Api = api_ip
+    nifi_api_host = f"https://{Nifi_Api}"
+    token_url = f"http://{Nifi_Host}:8080/nifi-api/access/token"
+    username = user or DEFAULT_USERNAME
+    password = secret or DEFAULT_PASSWORD
 
 def get_token():
     credentials = {"username": username, "password": password}
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
-    response = requests.post(token_url, data=credentials, headers=headers, verify=False)
+    response = http.post(token_url, data=credentials, headers=headers, verify=False)
     if response.status_code in [200, 201]:
         return response.text
     else:
@@ -59,31 +113,193 @@ def get_token():
 def get_root_process_groups(token):
     url = f"{nifi_api_host}/nifi-api/process-groups/root/process-groups"
     headers = {"Accept": "application/json", "Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers, verify=False)
+    response = http.get(url, headers=headers, verify=False)
     if response.status_code == 200:
         return response.json().get('processGroups', [])
     else:
         raise Exception(f"Failed to get process groups: {response.status_code} - {response.text}")
 
-def get_pg_info(token, pg_id, pg_name=None):
+####### Capture scope
+def parse_scope_patterns(text):
+    return [pattern.strip() for pattern in text.split(",") if pattern.strip()]
+
+def is_component_id(pattern):
+    return re.fullmatch(r"[0-9a-fA-F]{8}(-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}", pattern) is not None
+
+def build_scope(include, exclude, processor_types):
+    """Capture scope; 'paths'/'excluded_paths' are filled during the crawl and written to the report"""
+    if not include and not exclude and not processor_types:
+        return None
+    return {
+        'include': include,
+        'exclude': exclude,
+        'processor_types': processor_types,
+        'paths': [],
+        'excluded_paths': []
+    }
+
+def get_group_path(token, pg_id):
+    """Resolve a process group ID to its report path (Root > A > B) from the flow breadcrumb"""
     url = f"{nifi_api_host}/nifi-api/flow/process-groups/{pg_id}"
     headers = {"Accept": "application/json", "Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers, verify=False)
+    response = http.get(url, headers=headers, verify=False)
+    if response.status_code != 200:
+        raise Exception(f"Failed to get details for Process Group {pg_id}: {response.status_code} - {response.text}")
+
+    crumb = response.json()['processGroupFlow']['breadcrumb']
+    names = []
+    while crumb.get('parentBreadcrumb'):
+        names.insert(0, crumb['breadcrumb']['name'])
+        crumb = crumb['parentBreadcrumb']
+    return " > ".join(["Root"] + names)
+
+def could_contain_match(path, pattern):
+    """True when a descendant of the group at path could still match the include pattern"""
+    literal = re.split(r"[*?\[]", pattern, maxsplit=1)[0]
+    prefix = f"{path} > "
+    return prefix.startswith(literal) or literal.startswith(prefix)
+
+def scope_decision(scope, pg_id, path, parent_in_scope):
+    """Decide before fetching a group whether to prune it, crawl it only to reach descendants, or include it"""
+    if scope is None:
+        return "include"
+    if any(pattern == pg_id or fnmatch.fnmatchcase(path, pattern) for pattern in scope['exclude']):
+        scope['excluded_paths'].append(path)
+        return "prune"
+    if parent_in_scope or not scope['include_paths']:
+        return "include"
+    if any(fnmatch.fnmatchcase(path, pattern) for pattern in scope['include_paths']):
+        scope['paths'].append(path)
+        return "include"
+    if any(could_contain_match(path, pattern) for pattern in scope['include_paths']):
+        return "ancestor"
+    return "prune"
+
+def processor_type_in_scope(scope, processor_type):
+    if scope is None or not scope['processor_types']:
+        return True
+    return any(fnmatch.fnmatchcase(processor_type, pattern) for pattern in scope['processor_types'])
+
+def intern_property_schema(processor_type, keys):
+    """Share one key tuple per processor type and property set, so repeated property names are stored once"""
+    schemas = PROPERTY_SCHEMAS.setdefault(processor_type, {})
+    keys = tuple(keys)
+    return schemas.setdefault(keys, keys)
+
+def processor_properties(proc):
+    return dict(zip(proc['property_schema'], proc['property_values']))
+
+def format_bundle(bundle):
+    """group:artifact:version of a NAR bundle"""
+    if not bundle:
+        return "Unknown"
+    return f"{bundle.get('group')}:{bundle.get('artifact')}:{bundle.get('version')}"
+
+def get_extension_index(token):
+    """Map every installed processor and controller service type to the bundles that provide it (two calls)"""
+    headers = {"Accept": "application/json", "Authorization": f"Bearer {token}"}
+    index = {}
+    for endpoint, key in (("processor-types", "processorTypes"), ("controller-service-types", "controllerServiceTypes")):
+        response = http.get(f"{nifi_api_host}/nifi-api/flow/{endpoint}", headers=headers, verify=False)
+        if response.status_code != 200:
+            raise Exception(f"Failed to get {endpoint}: {response.status_code} - {response.text}")
+        for extension in response.json().get(key, []):
+            index.setdefault(extension['type'], set()).add(format_bundle(extension.get('bundle')))
+    return index
+
+def bundle_status(component, extension_index):
+    """Installed, Ghost (NiFi runs it as a placeholder because its bundle is gone) or Unknown without an index"""
+    if component['extension_missing']:
+        return "Ghost"
+    if extension_index is None:
+        return "Unknown"
+    return "Installed" if component['bundle'] in extension_index.get(component['type'], ()) else "Ghost"
+
+def get_version_control(component):
+    """Registry coordinates and sync state of a versioned process group, or None when it is not versioned"""
+    vci = component.get('versionControlInformation')
+    if not vci:
+        return None
+    return {
+        'registry_id': vci.get('registryId'),
+        'bucket_id': vci.get('bucketId'),
+        'flow_id': vci.get('flowId'),
+        'flow_name': vci.get('flowName', ''),
+        'version': vci.get('version'),
+        'state': vci.get('state', 'UNKNOWN')
+    }
+
+def get_pg_info(token, pg_id, pg_name=None, scope=None, parent_path="Root", in_scope=True,
+                version_control=None, skip_versioned=False):
+    group_path = f"{parent_path} > {pg_name if pg_name else 'Unknown Group'}"
+
+    # An up-to-date versioned group matches its registry version, so its contents need not be fetched
+    if skip_versioned and in_scope and version_control and version_control['state'] == 'UP_TO_DATE':
+        return {
+            'id': pg_id,
+            'name': pg_name if pg_name else "Unknown Group",
+            'path': group_path,
+            'in_scope': in_scope,
+            'version_control': version_control,
+            'contents_skipped': True,
+            'direct_processors': [],
+            'connections': [],
+            'child_groups': [],
+            'total_processors': 0
+        }
+
+    url = f"{nifi_api_host}/nifi-api/flow/process-groups/{pg_id}"
+    headers = {"Accept": "application/json", "Authorization": f"Bearer {token}"}
+    response = http.get(url, headers=headers, verify=False)
     if response.status_code != 200:
         raise Exception(f"Failed to get details for Process Group {pg_id}: {response.status_code} - {response.text}")
 
     data = response.json()
     flow = data['processGroupFlow']['flow']
 
-    processors = [{
-        'id': proc['component']['id'],
-        'name': proc['component']['name'],
-        'type': proc['component']['type']
-    } for proc in flow.get('processors', [])]
+    processors = []
+    for proc in (flow.get('processors', []) if in_scope else []):
+        comp = proc['component']
+        if not processor_type_in_scope(scope, comp['type']):
+            continue
+        properties = comp.get('config', {}).get('properties') or {}
+        processors.append({
+            'id': comp['id'],
+            'name': comp['name'],
+            'type': comp['type'],
+            'bundle': format_bundle(comp.get('bundle')),
+            'extension_missing': bool(comp.get('extensionMissing')),
+            'validation_errors': comp.get('validationErrors') or [],
+            'property_schema': intern_property_schema(comp['type'], properties.keys()),
+            'property_values': tuple(properties.values())
+        })
+
+    connections = []
+    for conn in (flow.get('connections', []) if in_scope else []):
+        comp = conn['component']
+        connections.append({
+            'id': comp['id'],
+            'name': comp.get('name', ''),
+            'source': comp['source'],
+            'destination': comp['destination'],
+            'relationships': sorted(comp.get('selectedRelationships') or []),
+            'back_pressure_object_threshold': comp.get('backPressureObjectThreshold'),
+            'back_pressure_data_size_threshold': comp.get('backPressureDataSizeThreshold'),
+            'flowfile_expiration': comp.get('flowFileExpiration'),
+            'prioritizers': comp.get('prioritizers') or [],
+            'load_balance_strategy': comp.get('loadBalanceStrategy'),
+            'load_balance_compression': comp.get('loadBalanceCompression')
+        })
 
     child_groups = []
     for child in flow.get('processGroups', []):
-        child_info = get_pg_info(token, child['component']['id'], pg_name=child['component']['name'])
+        child_id = child['component']['id']
+        child_name = child['component']['name']
+        decision = scope_decision(scope, child_id, f"{group_path} > {child_name}", in_scope)
+        if decision == "prune":
+            continue
+        child_info = get_pg_info(token, child_id, child_name, scope, group_path, decision == "include",
+                                 get_version_control(child['component']), skip_versioned)
         child_groups.append(child_info)
 
     total_processors = len(processors) + sum(child.get('total_processors', 0) for child in child_groups)
@@ -91,15 +307,281 @@ def get_pg_info(token, pg_id, pg_name=None):
     return {
         'id': pg_id,
         'name': pg_name if pg_name else "Unknown Group",
+        'path': group_path,
+        'in_scope': in_scope,
+        'version_control': version_control,
+        'contents_skipped': False,
         'direct_processors': processors,
+        'connections': connections,
         'child_groups': child_groups,
         'total_processors': total_processors
     }
 
+def get_controller_services(token, pg_id="root"):
+    """Fetch every controller service under a process group (descendants included) in one bulk call"""
+    url = f"{nifi_api_host}/nifi-api/flow/process-groups/{pg_id}/controller-services"
+    params = {"includeAncestorGroups": "false", "includeDescendantGroups": "true"}
+    headers = {"Accept": "application/json", "Authorization": f"Bearer {token}"}
+    response = http.get(url, headers=headers, params=params, verify=False)
+    if response.status_code != 200:
+        raise Exception(f"Failed to get controller services for Process Group {pg_id}: {response.status_code} - {response.text}")
+
+    services = []
+    for cs in response.json().get('controllerServices', []):
+        comp = cs['component']
+        services.append({
+            'id': comp['id'],
+            'name': comp['name'],
+            'type': comp['type'],
+            'bundle': format_bundle(comp.get('bundle')),
+            'extension_missing': bool(comp.get('extensionMissing')),
+            'state': comp.get('state', 'UNKNOWN'),
+            'validation_errors': comp.get('validationErrors') or [],
+            'version': cs.get('revision', {}).get('version'),
+            'parent_group_id': comp.get('parentGroupId', ''),
+            'properties': comp.get('properties', {}),
+            'referencing_processors': [{
+                'id': ref['component']['id'],
+                'name': ref['component']['name']
+            } for ref in comp.get('referencingComponents', [])
+                if ref['component'].get('referenceType') == 'Processor']
+        })
+    return services
+
+def get_flow_status(token, cluster_node_id=None):
+    """Fetch the runtime status of the whole flow with a single recursive call (one node's view if cluster_node_id is set)"""
+    url = f"{nifi_api_host}/nifi-api/flow/process-groups/root/status"
+    params = {"recursive": "true"}
+    if cluster_node_id:
+        params.update({"nodewise": "false", "clusterNodeId": cluster_node_id})
+    headers = {"Accept": "application/json", "Authorization": f"Bearer {token}"}
+    response = http.get(url, headers=headers, params=params, verify=False)
+    if response.status_code != 200:
+        raise Exception(f"Failed to get flow status: {response.status_code} - {response.text}")
+    return response.json()['processGroupStatus']['aggregateSnapshot']
+
+def get_cluster_nodes(token):
+    """List the cluster nodes from the coordinator; a standalone instance returns an empty list"""
+    url = f"{nifi_api_host}/nifi-api/controller/cluster"
+    headers = {"Accept": "application/json", "Authorization": f"Bearer {token}"}
+    response = http.get(url, headers=headers, verify=False)
+    if response.status_code == 409:
+        return []
+    if response.status_code != 200:
+        raise Exception(f"Failed to get cluster nodes: {response.status_code} - {response.text}")
+
+    return [{
+        'id': node['nodeId'],
+        'address': f"{node.get('address', '')}:{node.get('apiPort', '')}",
+        'status': node.get('status', 'UNKNOWN'),
+        'roles': sorted(node.get('roles') or []),
+        'active_threads': node.get('activeThreadCount', 0),
+        'queued': node.get('queued', '')
+    } for node in response.json()['cluster'].get('nodes', [])]
+
+def flatten_status(snapshot, status=None):
+    """Flatten a recursive status snapshot into per-processor and per-connection entries"""
+    if status is None:
+        status = {'processors': [], 'connections': []}
+
+    for entry in snapshot.get('processorStatusSnapshots', []):
+        proc = entry['processorStatusSnapshot']
+        status['processors'].append({
+            'id': proc['id'],
+            'name': proc['name'],
+            'group_id': proc.get('groupId', ''),
+            'run_status': proc.get('runStatus', 'UNKNOWN'),
+            'active_threads': proc.get('activeThreadCount', 0)
+        })
+
+    for entry in snapshot.get('connectionStatusSnapshots', []):
+        conn = entry['connectionStatusSnapshot']
+        status['connections'].append({
+            'id': conn['id'],
+            'source_name': conn.get('sourceName', ''),
+            'destination_name': conn.get('destinationName', ''),
+            'name': conn.get('name', ''),
+            'source_id': conn.get('sourceId', ''),
+            'destination_id': conn.get('destinationId', ''),
+            'queued_count': conn.get('flowFilesQueued', 0),
+            'queued_bytes': conn.get('bytesQueued', 0)
+        })
+
+    for entry in snapshot.get('processGroupStatusSnapshots', []):
+        flatten_status(entry['processGroupStatusSnapshot'], status)
+
+    return status
+
+def get_flow_fingerprint(token):
+    """One hash of the whole flow for Watch mode: the precheck fingerprints of the root level and every root group
+
+    Bulletins are left out, since Watch never counts them as drift.
+    """
+    fingerprints = build_precheck_fingerprints(get_precheck_payloads(token, include_bulletins=False))
+    return hashlib.sha256(json.dumps([fingerprints['root'], fingerprints['groups']], sort_keys=True).encode("utf-8")).hexdigest()
+
+def get_all_processors(token):
+    """Fetch every processor entity in the flow (descendants included) in one bulk call"""
+    url = f"{nifi_api_host}/nifi-api/process-groups/root/processors"
+    params = {"includeDescendantGroups": "true"}
+    headers = {"Accept": "application/json", "Authorization": f"Bearer {token}"}
+    response = http.get(url, headers=headers, params=params, verify=False)
+    if response.status_code != 200:
+        raise Exception(f"Failed to get processors: {response.status_code} - {response.text}")
+    return response.json().get('processors', [])
+
+def map_group_owners(snapshot, owner_id, owners, names=None):
+    """Map every group ID under a status snapshot to the root group that contains it (and to its name, if names is given)"""
+    for entry in snapshot.get('processGroupStatusSnapshots', []):
+        owners[entry['id']] = owner_id or entry['id']
+        if names is not None:
+            names[entry['id']] = entry['processGroupStatusSnapshot'].get('name', '')
+        map_group_owners(entry['processGroupStatusSnapshot'], owner_id or entry['id'], owners, names)
+    return owners
+
+def get_precheck_payloads(token, include_bulletins=True):
+    """Fetch the six bulk payloads the precheck is built from: root groups, recursive status, all processors,
+    controller services, parameter contexts and bulletins (empty when include_bulletins is False)"""
+    calls = {'root_groups': get_root_process_groups, 'status': get_flow_status, 'processors': get_all_processors,
+             'services': get_controller_services, 'contexts': get_parameter_contexts}
+    if include_bulletins:
+        calls['bulletins'] = get_bulletins
+    with ThreadPoolExecutor(max_workers=CRAWL_WORKERS) as executor:
+        futures = {name: executor.submit(call, token) for name, call in calls.items()}
+        return {'bulletins': [], **{name: future.result() for name, future in futures.items()}}
+
+def build_precheck_fingerprints(payloads):
+    """Fingerprint every root group, and the root level itself, from the precheck payloads
+
+    Content is hashed rather than revision numbers, since NiFi resets revisions on restart. Everything
+    the report records except queue depths goes in: group names, processor configuration, connections,
+    controller services, parameters and bulletin templates. Connections are only known from the status
+    payload (name, source and destination), so a change to their settings alone is left to the crawl.
+    """
+    root_groups, status, processors = payloads['root_groups'], payloads['status'], payloads['processors']
+    group_names = {}
+    owners = map_group_owners(status, None, {}, group_names)
+
+    parts = {}
+    def part(part_id):
+        return parts.setdefault(part_id, {'group': [], 'status': [], 'processors': [], 'services': [],
+                                          'child_groups': [], 'connections': [], 'bulletins': []})
+
+    part('root')['parameter_contexts'] = sorted(
+        [ctx['component']['id'], ctx['component']['name'],
+         sorted([p['parameter']['name'], p['parameter'].get('value')] for p in ctx['component'].get('parameters', []))]
+        for ctx in payloads['contexts'])
+    for pg in root_groups:
+        part(pg['component']['id'])['group'] = [pg['component']['name']] + [pg.get(count) for count in PRECHECK_GROUP_COUNTS]
+
+    root_status = flatten_status({k: v for k, v in status.items() if k != 'processGroupStatusSnapshots'})
+    part('root')['status'] = sorted([p['id'], p['name'], p['run_status']] for p in root_status['processors'])
+    part('root')['connections'] = [[c['id'], c['name'], c['source_id'], c['destination_id']] for c in root_status['connections']]
+    for entry in status.get('processGroupStatusSnapshots', []):
+        group_status = flatten_status(entry['processGroupStatusSnapshot'])
+        part(entry['id'])['status'] = sorted([p['id'], p['name'], p['group_id'], p['run_status']] for p in group_status['processors'])
+        part(entry['id'])['connections'] = [[c['id'], c['name'], c['source_id'], c['destination_id']]
+                                            for c in group_status['connections']]
+
+    for pg_id, owner_id in owners.items():
+        if pg_id != owner_id:
+            part(owner_id)['child_groups'].append([pg_id, group_names[pg_id]])
+    for bulletin in payloads['bulletins']:
+        # Templates rather than messages, so repeats of a known message do not move the fingerprint
+        part(owners.get(bulletin.get('groupId'), 'root'))['bulletins'].append(
+            [bulletin.get('sourceId', ''), bulletin.get('level', ''), message_template(bulletin.get('message', ''))])
+    for proc in processors:
+        comp = proc['component']
+        config = {k: v for k, v in comp.get('config', {}).items() if k != 'descriptors'}
+        part(owners.get(comp.get('parentGroupId'), 'root'))['processors'].append(
+            [comp['id'], comp['name'], comp['type'], format_bundle(comp.get('bundle')), comp.get('state'), config,
+             sorted(comp.get('validationErrors') or [])])
+    for cs in payloads['services']:
+        part(owners.get(cs['parent_group_id'], 'root'))['services'].append(
+            [cs['id'], cs['name'], cs['type'], cs['bundle'], cs['state'], cs['properties'], sorted(cs['validation_errors'])])
+
+    fingerprints = {}
+    for part_id, part in parts.items():
+        for key in ('processors', 'services', 'child_groups', 'connections'):
+            part[key].sort(key=lambda entry: entry[0])
+        part['bulletins'] = sorted({tuple(entry) for entry in part['bulletins']})
+        fingerprints[part_id] = hashlib.sha256(json.dumps(part, sort_keys=True).encode("utf-8")).hexdigest()
+    names = {pg['component']['id']: pg['component']['name'] for pg in root_groups}
+    return {'root': fingerprints.pop('root'), 'groups': fingerprints, 'names': names}
+
+def collect_validation_errors(pg_info, results=None):
+    """Map processor ID to the validation errors already present in the crawled flow payload"""
+    if results is None:
+        results = {}
+
+    for proc in pg_info['direct_processors']:
+        if proc['validation_errors']:
+            results[proc['id']] = proc['validation_errors']
+
+    for child in pg_info['child_groups']:
+        collect_validation_errors(child, results)
+
+    return results
+
+def get_bulletins(token):
+    """Fetch the newest BULLETIN_LIMIT bulletins in one call, oldest first; NiFi only keeps the last few minutes of bulletins
+
+    The board returns the newest bulletins first and its "after" cursor only reaches newer ones, so
+    there is no paging back: when the limit is reached, older bulletins are left out and a warning says so.
+    """
+    url = f"{nifi_api_host}/nifi-api/flow/bulletin-board"
+    headers = {"Accept": "application/json", "Authorization": f"Bearer {token}"}
+    response = http.get(url, headers=headers, params={"limit": BULLETIN_LIMIT}, verify=False)
+    if response.status_code != 200:
+        raise Exception(f"Failed to get bulletin board: {response.status_code} - {response.text}")
+    entries = response.json()['bulletinBoard'].get('bulletins', [])
+    if len(entries) >= BULLETIN_LIMIT:
+        print(f"⚠️ Bulletin board returned its limit of {BULLETIN_LIMIT} bulletins, older bulletins are not included")
+    # Entries the user cannot read carry no bulletin body
+    return [entry['bulletin'] for entry in sorted(entries, key=lambda entry: entry['id']) if entry.get('bulletin')]
+
+@lru_cache(maxsize=4096)
+def message_template(message):
+    """Bulletin message with its variable parts (FlowFiles, IDs, numbers) replaced by placeholders"""
+    for pattern, placeholder in MESSAGE_VARIABLES:
+        message = pattern.sub(placeholder, message)
+    return " ".join(message.split())
+
+def component_errors(validation_errors, controller_services):
+    """Validation errors of processors (by ID) and controller services, tagged with their source type"""
+    errors = {proc_id: ("PROCESSOR", proc_errors) for proc_id, proc_errors in validation_errors.items()}
+    errors.update((cs['id'], ("CONTROLLER_SERVICE", cs['validation_errors'])) for cs in controller_services if cs['validation_errors'])
+    return errors
+
+def index_component_health(bulletins, validation_errors, names):
+    """Bulletins (deduplicated by message template) and validation errors indexed by component ID"""
+    health = {}
+    def entry(component_id, name, source_type):
+        return health.setdefault(component_id, {'name': name, 'source_type': source_type, 'level': None,
+                                                'count': 0, 'messages': {}, 'validation_errors': []})
+
+    for bulletin in bulletins:
+        component_id = bulletin.get('sourceId') or 'flow'
+        item = entry(component_id, bulletin.get('sourceName') or names.get(component_id, component_id), bulletin.get('sourceType', 'UNKNOWN'))
+        level = (bulletin.get('level') or 'INFO').upper()
+        template = message_template(bulletin.get('message') or '')
+        message = item['messages'].setdefault(template, {'level': level, 'count': 0})
+        message['count'] += 1
+        if BULLETIN_LEVELS.get(level, 0) > BULLETIN_LEVELS.get(message['level'], 0):
+            message['level'] = level
+        if item['level'] is None or BULLETIN_LEVELS.get(level, 0) > BULLETIN_LEVELS.get(item['level'], 0):
+            item['level'] = level
+        item['count'] += 1
+
+    for component_id, (source_type, errors) in validation_errors.items():
+        entry(component_id, names.get(component_id, component_id), source_type)['validation_errors'] = sorted(errors)
+
+    return health
+
 def get_processor_config(token, processor_id):
     url = f"{nifi_api_host}/nifi-api/processors/{processor_id}"
     headers = {"Accept": "application/json", "Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers, verify=False)
+    response = http.get(url, headers=headers, verify=False)
     if response.status_code == 200:
         return response.json()
     else:
@@ -112,18 +594,15 @@ def find_execute_sql_processors(pg_info, token, path="Root", results=None):
     current_path = f"{path} > {pg_info['name']}"
     for proc in pg_info['direct_processors']:
         if "ExecuteSQL" in proc['type']:
-            config = get_processor_config(token, proc['id'])
-            if config:
-                props = config['component']['config']['properties']
-                sql_pre_query = props.get("sql-pre-query", "Not Set")
-                sql_post_query = props.get("sql-post-query", "Not Set")
-                results.append({
-                    "path": current_path,
-                    "processor_name": proc['name'],
-                    "processor_id": proc['id'],
-                    "sql_pre_query": sql_pre_query,
-                    "sql_post_query": sql_post_query
-                })
+            # Properties come with the crawled flow payload, no per-processor request needed
+            props = processor_properties(proc)
+            results.append({
+                "path": current_path,
+                "processor_name": proc['name'],
+                "processor_id": proc['id'],
+                "sql_pre_query": props.get("sql-pre-query", "Not Set"),
+                "sql_post_query": props.get("sql-post-query", "Not Set")
+            })
 
     for child in pg_info['child_groups']:
         find_execute_sql_processors(child, token, current_path, results)
@@ -165,6 +644,100 @@ def collect_all_processors_scheduling(pg_info, token, path="Root", results=None)
 
     return results
 
+def collect_connections(pg_info, path="Root", results=None):
+    """Collect connection configuration already present in the crawled flow payload"""
+    if results is None:
+        results = []
+
+    current_path = f"{path} > {pg_info['name']}"
+    for conn in pg_info['connections']:
+        results.append(dict(conn, path=current_path))
+
+    for child in pg_info['child_groups']:
+        collect_connections(child, current_path, results)
+
+    return results
+
+def collect_processor_properties(pg_info, path="Root", results=None):
+    """Collect every processor's properties already present in the crawled flow payload"""
+    if results is None:
+        results = []
+
+    current_path = f"{path} > {pg_info['name']}"
+    for proc in pg_info['direct_processors']:
+        results.append(dict(proc, path=current_path))
+
+    for child in pg_info['child_groups']:
+        collect_processor_properties(child, current_path, results)
+
+    return results
+
+def filter_to_scope(pg_infos, controller_services, flow_status, skipped_ids=frozenset()):
+    """Keep only the flow-wide listings that belong to the crawled in-scope groups (and the status inside skipped ones)"""
+    group_ids, processor_ids, connection_ids = set(), set(), set()
+    pending = list(pg_infos)
+    while pending:
+        pg_info = pending.pop()
+        if pg_info['in_scope']:
+            group_ids.add(pg_info['id'])
+        processor_ids.update(proc['id'] for proc in pg_info['direct_processors'])
+        connection_ids.update(conn['id'] for conn in pg_info['connections'])
+        pending.extend(pg_info['child_groups'])
+
+    controller_services = [cs for cs in controller_services
+                           if cs['parent_group_id'] in group_ids
+                           or any(ref['id'] in processor_ids for ref in cs['referencing_processors'])]
+    flow_status = {
+        'processors': [proc for proc in flow_status['processors'] if proc['id'] in processor_ids or proc['id'] in skipped_ids],
+        'connections': [conn for conn in flow_status['connections'] if conn['id'] in connection_ids or conn['id'] in skipped_ids]
+    }
+    return controller_services, flow_status
+
+def collect_skipped_groups(pg_info, results=None):
+    """IDs of the versioned groups whose contents were not crawled"""
+    if results is None:
+        results = set()
+    if pg_info.get('contents_skipped'):
+        results.add(pg_info['id'])
+    for child in pg_info['child_groups']:
+        collect_skipped_groups(child, results)
+    return results
+
+def skipped_component_ids(snapshot, skipped_groups, inside=False, ids=None):
+    """Collect the group, processor and connection IDs that sit inside skipped versioned groups"""
+    if ids is None:
+        ids = set()
+    for entry in snapshot.get('processGroupStatusSnapshots', []):
+        group = entry['processGroupStatusSnapshot']
+        group_inside = inside or entry['id'] in skipped_groups
+        if group_inside:
+            ids.add(entry['id'])
+            ids.update(proc['processorStatusSnapshot']['id'] for proc in group.get('processorStatusSnapshots', []))
+            ids.update(conn['connectionStatusSnapshot']['id'] for conn in group.get('connectionStatusSnapshots', []))
+        skipped_component_ids(group, skipped_groups, group_inside, ids)
+    return ids
+
+def drop_skipped_contents(skipped_ids, controller_services):
+    """Remove the controller services of skipped versioned groups, matching what the crawl recorded
+
+    Their runtime status is kept: the registry version says nothing about whether the processors run.
+    """
+    return [cs for cs in controller_services if cs['parent_group_id'] not in skipped_ids]
+
+def print_scope(scope):
+    """Scope header lines, so Compare knows this report only covers part of the flow"""
+    lines = []
+    for path in sorted(scope['paths']):
+        lines.append(f"Capture Scope Path: {path}")
+    for path in sorted(scope['excluded_paths']):
+        lines.append(f"Capture Scope Excluded Path: {path}")
+    if scope['processor_types']:
+        lines.append(f"Capture Scope Processor Types: {', '.join(scope['processor_types'])}")
+    if scope['include_paths'] and not scope['paths']:
+        lines.append("Capture Scope Path: (no process group matched)")
+    lines.append("")
+    return lines
+
 def print_pg_info(pg_info, index=None, indent=0):
     prefix = "   " * indent
     lines = []
@@ -184,22 +757,31 @@ def print_pg_info(pg_info, index=None, indent=0):
     lines.append(f"{prefix}   - Total processors inside (including all child groups): {pg_info['total_processors']}")
     lines.append(f"{prefix}   - Direct processors inside: {direct_proc_count} [{proc_names}]")
     lines.append(f"{prefix}   - Number of child process groups inside: {len(pg_info['child_groups'])}")
+    version_control = pg_info.get('version_control')
+    if version_control:
+        skipped = " - contents not captured" if pg_info.get('contents_skipped') else ""
+        lines.append(f"{prefix}   - Version Control: {version_control['flow_name']} v{version_control['version']} "
+                     f"[{version_control['state']}] (Registry: {version_control['registry_id']}, "
+                     f"Bucket: {version_control['bucket_id']}, Flow ID: {version_control['flow_id']}){skipped}")
 
     for child in pg_info['child_groups']:
         lines.extend(print_pg_info(child, indent=indent+1))
 
     return lines
 
-def get_root_parameter_context(token):
+def get_parameter_contexts(token):
     url = f"{nifi_api_host}/nifi-api/flow/parameter-contexts"
     headers = {"Accept": "application/json", "Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers, verify=False)
+    response = http.get(url, headers=headers, verify=False)
     if response.status_code == 200:
-        contexts = response.json().get('parameterContexts', [])
-        return contexts[0] if contexts else None
+        return response.json().get('parameterContexts', [])
     else:
         raise Exception(f"Failed to get parameter contexts: {response.status_code} - {response.text}")
 
+def get_root_parameter_context(token):
+    contexts = get_parameter_contexts(token)
+    return contexts[0] if contexts else None
+
 def print_root_parameter_context(context):
     lines = []
     if not context:
@@ -221,6 +803,198 @@ def print_root_parameter_context(context):
         lines.append("No parameters found in this context.")
     return lines
 
+def print_controller_services(services):
+    """Format controller service information for output"""
+    lines = []
+    lines.append("\n----------Below are the Controller Services Info----------------")
+
+    if not services:
+        lines.append("✅ No controller services found.")
+        return lines
+
+    lines.append(f"Total Controller Services: {len(services)}")
+    lines.append("")
+
+    for cs in sorted(services, key=lambda s: (s['name'], s['id'])):
+        if cs['referencing_processors']:
+            refs = ", ".join([f"{r['name']} (ID: {r['id']})" for r in cs['referencing_processors']])
+        else:
+            refs = "None"
+        lines.append(f"Controller Service: {cs['name']} (ID: {cs['id']})")
+        lines.append(f"  Type                   : {cs['type']}")
+        lines.append(f"  Bundle                 : {cs['bundle']}")
+        lines.append(f"  Bundle Status          : {cs['bundle_status']}")
+        lines.append(f"  State                  : {cs['state']}")
+        lines.append(f"  Parent Group ID        : {cs['parent_group_id']}")
+        lines.append(f"  Referencing Processors : {refs}")
+        lines.append("  Properties:")
+        for key, value in cs['properties'].items():
+            lines.append(f"    - {key}: {format_property_value(value)}")
+        lines.append("-" * 60)
+
+    return lines
+
+def print_connections(connections):
+    """Format connection and back-pressure configuration for output"""
+    lines = []
+    lines.append("\n----------Below are the Connections Info----------------")
+
+    if not connections:
+        lines.append("✅ No connections found.")
+        return lines
+
+    lines.append(f"Total Connections: {len(connections)}")
+    lines.append("")
+
+    for conn in connections:
+        source = conn['source']
+        destination = conn['destination']
+        lines.append(f"Connection: {source['name']} -> {destination['name']} (ID: {conn['id']})")
+        lines.append(f"  Path                     : {conn['path']}")
+        lines.append(f"  Source                   : {source['name']} (ID: {source['id']}, Type: {source.get('type')})")
+        lines.append(f"  Destination              : {destination['name']} (ID: {destination['id']}, Type: {destination.get('type')})")
+        lines.append(f"  Relationships            : {', '.join(conn['relationships']) or 'None'}")
+        lines.append(f"  Back Pressure Objects    : {conn['back_pressure_object_threshold']}")
+        lines.append(f"  Back Pressure Size       : {conn['back_pressure_data_size_threshold']}")
+        lines.append(f"  FlowFile Expiration      : {conn['flowfile_expiration']}")
+        lines.append(f"  Prioritizers             : {', '.join(conn['prioritizers']) or 'None'}")
+        lines.append(f"  Load Balance Strategy    : {conn['load_balance_strategy']}")
+        lines.append(f"  Load Balance Compression : {conn['load_balance_compression']}")
+        lines.append("-" * 60)
+
+    return lines
+
+def format_property_value(value):
+    """One-line property value: multi-line values (scripts, SQL) keep their line breaks as \\n"""
+    if value is None:
+        return "Not Set"
+    return str(value).replace("\r\n", "\n").replace("\n", "\\n")
+
+def print_processor_properties(processors):
+    """Format every processor's properties for output"""
+    lines = []
+    lines.append("\n----------Below are the Processor Properties Info----------------")
+
+    if not processors:
+        lines.append("✅ No processors found.")
+        return lines
+
+    lines.append(f"Total Processors with Properties: {len(processors)}")
+    lines.append("")
+
+    for proc in processors:
+        lines.append(f"Processor Properties: {proc['name']} (ID: {proc['id']})")
+        lines.append(f"  Path : {proc['path']}")
+        lines.append(f"  Type : {proc['type']}")
+        lines.append(f"  Bundle : {proc['bundle']}")
+        lines.append(f"  Bundle Status : {proc['bundle_status']}")
+        lines.append("  Properties:")
+        for key, value in zip(proc['property_schema'], proc['property_values']):
+            lines.append(f"    - {key}: {format_property_value(value)}")
+        lines.append("-" * 60)
+
+    return lines
+
+def print_extension_bundles(extension_index, processors, services):
+    """Format every installed bundle and every bundle the flow uses, with the number of components on each"""
+    lines = []
+    lines.append("\n----------Below are the Extension Bundles Info----------------")
+
+    usage = {}
+    for label, components in (("Processors", processors), ("Controller Services", services)):
+        for component in components:
+            usage.setdefault(component['bundle'], {"Processors": 0, "Controller Services": 0})[label] += 1
+    installed = set().union(*extension_index.values()) if extension_index else set()
+    bundles = sorted(installed | set(usage))
+
+    if not bundles:
+        lines.append("✅ No extension bundles found.")
+        return lines
+
+    lines.append(f"Total Bundles: {len(bundles)}")
+    lines.append("")
+
+    for coordinate in bundles:
+        counts = usage.get(coordinate, {"Processors": 0, "Controller Services": 0})
+        if extension_index is None:
+            is_installed = "Unknown"
+        else:
+            is_installed = "Yes" if coordinate in installed else "No"
+        lines.append(f"Extension Bundle: {coordinate.split(':')[1] if coordinate.count(':') == 2 else coordinate} (ID: {coordinate})")
+        lines.append(f"  Installed           : {is_installed}")
+        lines.append(f"  Processors          : {counts['Processors']}")
+        lines.append(f"  Controller Services : {counts['Controller Services']}")
+        lines.append("-" * 60)
+
+    return lines
+
+def print_component_health(health):
+    """Format bulletins and validation errors per component for output"""
+    lines = []
+    lines.append("\n----------Below are the Component Health Info----------------")
+
+    if not health:
+        lines.append("✅ No bulletins or validation errors found.")
+        return lines
+
+    total = sum(item['count'] for item in health.values())
+    distinct = sum(len(item['messages']) for item in health.values())
+    lines.append(f"Total Components with Bulletins or Validation Errors: {len(health)}")
+    lines.append(f"Total Bulletins: {total} ({distinct} distinct messages)")
+    lines.append("")
+
+    def rank(entry):
+        # Failing validation ranks with errors; otherwise the highest bulletin level first
+        component_id, item = entry
+        level = 'ERROR' if item['validation_errors'] else item['level']
+        return (-BULLETIN_LEVELS.get(level or 'INFO', 0), item['name'], component_id)
+
+    for component_id, item in sorted(health.items(), key=rank):
+        lines.append(f"Component Health: {item['name']} (ID: {component_id})")
+        lines.append(f"  Source Type       : {item['source_type']}")
+        lines.append(f"  Highest Level     : {item['level'] or 'None'}")
+        lines.append(f"  Bulletins         : {item['count']}")
+        lines.append(f"  Validation Errors : {' | '.join(item['validation_errors']) if item['validation_errors'] else 'None'}")
+        for index, (template, message) in enumerate(sorted(item['messages'].items(),
+                                                           key=lambda m: (-BULLETIN_LEVELS.get(m[1]['level'], 0), -m[1]['count'], m[0])), start=1):
+            lines.append(f"  Message {index:<9} : [{message['level']} x{message['count']}] {format_property_value(template)}")
+        lines.append("-" * 60)
+
+    return lines
+
+def print_runtime_status(status, validation_errors):
+    """Format runtime status information for output"""
+    lines = []
+    lines.append("\n----------Below are the Runtime Status Info----------------")
+
+    run_counts = {}
+    for proc in status['processors']:
+        run_counts[proc['run_status']] = run_counts.get(proc['run_status'], 0) + 1
+    counts = ", ".join([f"{state}: {count}" for state, count in sorted(run_counts.items())]) or "None"
+    total_queued = sum(conn['queued_count'] for conn in status['connections'])
+    total_bytes = sum(conn['queued_bytes'] for conn in status['connections'])
+
+    lines.append(f"Total Processors with Status: {len(status['processors'])} [{counts}]")
+    lines.append(f"Total Queued FlowFiles: {total_queued} ({total_bytes} bytes)")
+    lines.append("")
+
+    for proc in sorted(status['processors'], key=lambda p: (p['name'], p['id'])):
+        errors = validation_errors.get(proc['id'])
+        lines.append(f"Processor Status: {proc['name']} (ID: {proc['id']})")
+        lines.append(f"  Group ID          : {proc['group_id']}")
+        lines.append(f"  Run Status        : {proc['run_status']}")
+        lines.append(f"  Active Threads    : {proc['active_threads']}")
+        lines.append(f"  Validation Errors : {' | '.join(errors) if errors else 'None'}")
+        lines.append("-" * 60)
+
+    for conn in sorted(status['connections'], key=lambda c: c['id']):
+        lines.append(f"Connection Status: {conn['source_name']} -> {conn['destination_name']} (ID: {conn['id']})")
+        lines.append(f"  Queued Count      : {conn['queued_count']}")
+        lines.append(f"  Queued Bytes      : {conn['queued_bytes']}")
+        lines.append("-" * 60)
+
+    return lines
+
 def print_scheduling_info(scheduling_data):
     """Format scheduling information for output"""
     lines = []
@@ -254,24 +1028,27 @@ def ensure_reports_directory():
         os.makedirs(reports_dir)
     return reports_dir
 
-def save_output_to_file(content, is_backup=False):
-    reports_dir = ensure_reports_directory()
+def save_output_to_file(content, is_backup=False, reports_dir=None):
+    reports_dir = reports_dir or ensure_reports_directory()
     now = datetime.datetime.now()
     suffix = now.strftime("%d%m%Y_%H-%M-%S")
     extension = ".archive" if is_backup else ".txt"
-    filename = f"Nifi_Pre_Validation_Report_{suffix}{extension}"
+    filename = f"{REPORT_PREFIX}{suffix}{extension}"
     filepath = os.path.join(reports_dir, filename)
     with open(filepath, "w", encoding="utf-8") as f:
         f.write(content)
     print(f"\n✅ Report saved to: {filepath}")
+    return filepath
 
-def save_detailed_execute_sql(results, is_backup=False):
-    reports_dir = ensure_reports_directory()
+def detailed_report_path(is_backup=False, reports_dir=None):
+    reports_dir = reports_dir or ensure_reports_directory()
     now = datetime.datetime.now()
     suffix = now.strftime("%d_%m_%Y_%H-%M-%S")
     extension = ".archive" if is_backup else ".txt"
-    filename = f"Nifi_Pre_Validation_Detailed_Report_{suffix}{extension}"
-    filepath = os.path.join(reports_dir, filename)
+    return os.path.join(reports_dir, f"Nifi_Pre_Validation_Detailed_Report_{suffix}{extension}")
+
+def save_detailed_execute_sql(results, is_backup=False, reports_dir=None):
+    filepath = detailed_report_path(is_backup, reports_dir)
     with open(filepath, "w", encoding="utf-8") as f:
         f.write("=== ExecuteSQL Processor SQL Pre/Post-Query Report ===\n\n")
         if not results:
@@ -280,10 +1057,163 @@ def save_detailed_execute_sql(results, is_backup=False):
             f.write(f"Path: {item['path']}\n")
             f.write(f"  Processor Name  : {item['processor_name']}\n")
             f.write(f"  Processor ID    : {item['processor_id']}\n")
-            f.write(f"  SQL Pre-Query   : {item['sql_pre_query']}\n")
-            f.write(f"  SQL Post-Query  : {item['sql_post_query']}\n")
+            f.write(f"  SQL Pre-Query   : {format_property_value(item['sql_pre_query'])}\n")
+            f.write(f"  SQL Post-Query  : {format_property_value(item['sql_post_query'])}\n")
             f.write("-" * 60 + "\n")
     print(f"✅ Detailed ExecuteSQL Report saved to: {filepath}")
+    return filepath
+
+def print_precheck_runtime(payloads):
+    """Component health and runtime status lines, as the crawl prints them, from the precheck payloads alone"""
+    # The crawl records the processors inside root groups, not the ones at root level
+    owners = map_group_owners(payloads['status'], None, {})
+    processors = [proc['component'] for proc in payloads['processors'] if proc['component'].get('parentGroupId') in owners]
+    validation_errors = {comp['id']: comp['validationErrors'] for comp in processors if comp.get('validationErrors')}
+    names = {comp['id']: comp['name'] for comp in processors}
+    names.update((cs['id'], cs['name']) for cs in payloads['services'])
+    health = index_component_health(payloads['bulletins'], component_errors(validation_errors, payloads['services']), names)
+    return print_component_health(health), print_runtime_status(flatten_status(payloads['status']), validation_errors)
+
+def replace_report_section(content, section_lines):
+    """Put section_lines in place of the report section with the same header, leaving every other section as it is"""
+    lines = content.split("\n")
+    header = section_lines[0].strip()
+    if header not in lines:
+        return content
+    start = lines.index(header)
+    # Each section ends at the blank line that opens the next one
+    end = next((index - 1 for index in range(start + 1, len(lines)) if lines[index].startswith("----------Below are the")), len(lines))
+    return "\n".join(lines[:start] + "\n".join(section_lines).lstrip("\n").split("\n") + lines[end:])
+
+def save_no_drift_report(baseline_report, fingerprints, payloads):
+    """Save the baseline's reports again under this run's name, so the latest report is always this run's
+
+    Only called when every fingerprint matches the baseline, so its configuration still describes the flow.
+    Component health and runtime status (bulletin counts, queue depths) are rebuilt from this run's precheck payloads.
+    """
+    with open(baseline_report, "r", encoding="utf-8") as f:
+        content = f.read()
+    for section_lines in print_precheck_runtime(payloads):
+        content = replace_report_section(content, section_lines)
+    report_path = save_output_to_file(f"No drift since: {os.path.basename(baseline_report)}\n\n{content}")
+    write_snapshot(parse_report_lines(content.split("\n")), snapshot_path_for(report_path))
+    save_fingerprints(report_path, fingerprints, scoped=False)
+
+    baseline_detailed = baseline_detailed_report(baseline_report)
+    if baseline_detailed:
+        filepath = detailed_report_path()
+        with open(baseline_detailed, "r", encoding="utf-8") as source, open(filepath, "w", encoding="utf-8") as f:
+            f.write(source.read())
+        print(f"✅ Detailed ExecuteSQL Report saved to: {filepath}")
+    else:
+        print(f"⚠️ No Detailed ExecuteSQL Report found for '{baseline_report}'")
+    return report_path
+
+def build_report(token, scope=None, skip_versioned=False):
+    """Crawl the flow (or the scoped part of it) and return the report lines together with the ExecuteSQL details"""
+    root_process_groups = get_root_process_groups(token)
+    total_root = len(root_process_groups)
+
+    # Resolve ID includes to paths up front so the whole crawl can be pruned by path
+    crawl_targets = []
+    if scope is not None:
+        # A resolved path is a literal: escape it so names with [ ] * ? only match themselves
+        scope['include_paths'] = [glob.escape(get_group_path(token, pattern)) if is_component_id(pattern) else pattern
+                                  for pattern in scope['include']]
+    for pg in root_process_groups:
+        decision = scope_decision(scope, pg['component']['id'], f"Root > {pg['component']['name']}", False)
+        if decision != "prune":
+            crawl_targets.append((pg, decision == "include"))
+
+    output_lines = [f"Total number of process groups at root: {total_root}\n"]
+    execute_sql_data = []
+    scheduling_data = []
+    connection_data = []
+    processor_data = []
+
+    # Crawl root groups concurrently; the bulk controller service listing rides along in the same pool
+    with ThreadPoolExecutor(max_workers=CRAWL_WORKERS) as executor:
+        services_future = executor.submit(get_controller_services, token)
+        status_future = executor.submit(get_flow_status, token)
+        index_future = executor.submit(get_extension_index, token)
+        bulletins_future = executor.submit(get_bulletins, token)
+        pg_infos = list(executor.map(
+            lambda target: get_pg_info(token, target[0]['component']['id'], target[0]['component']['name'],
+                                       scope, "Root", target[1], get_version_control(target[0]['component']),
+                                       skip_versioned),
+            crawl_targets))
+        controller_services = services_future.result()
+        status_snapshot = status_future.result()
+        flow_status = flatten_status(status_snapshot)
+        try:
+            extension_index = index_future.result()
+        except Exception as e:
+            print(f"⚠️ Extension index unavailable, bundles are recorded without their install status: {e}")
+            extension_index = None
+        try:
+            bulletins = bulletins_future.result()
+        except Exception as e:
+            print(f"⚠️ Bulletin board unavailable, health is built from validation errors only: {e}")
+            bulletins = []
+
+    skipped_groups = set()
+    for pg_info in pg_infos:
+        collect_skipped_groups(pg_info, skipped_groups)
+    skipped_ids = skipped_component_ids(status_snapshot, skipped_groups) if skipped_groups else set()
+
+    if scope is not None:
+        output_lines.extend(print_scope(scope))
+        controller_services, flow_status = filter_to_scope(pg_infos, controller_services, flow_status, skipped_ids)
+    if skipped_ids:
+        controller_services = drop_skipped_contents(skipped_ids, controller_services)
+
+    validation_errors = {}
+
+    for idx, pg_info in enumerate(pg_infos, start=1):
+        output_lines.extend(print_pg_info(pg_info, index=idx))
+        output_lines.append("")
+
+        collect_validation_errors(pg_info, validation_errors)
+        collect_connections(pg_info, path="Root", results=connection_data)
+        collect_processor_properties(pg_info, path="Root", results=processor_data)
+        execute_sql_data.extend(find_execute_sql_processors(pg_info, token, path="Root"))
+        scheduling_data.extend(collect_all_processors_scheduling(pg_info, token, path="Root"))
+
+    for component in processor_data + controller_services:
+        component['bundle_status'] = bundle_status(component, extension_index)
+
+    # Add parameter context
+    root_parameter_context = get_root_parameter_context(token)
+    output_lines.extend(print_root_parameter_context(root_parameter_context))
+
+    # Add scheduling information
+    output_lines.extend(print_scheduling_info(scheduling_data))
+
+    # Add controller services
+    output_lines.extend(print_controller_services(controller_services))
+
+    # Add connections
+    output_lines.extend(print_connections(connection_data))
+
+    # Add processor properties
+    output_lines.extend(print_processor_properties(processor_data))
+
+    # Add component health: bulletins and the validation errors already in the payload, no per-component calls
+    names = {component['id']: component['name'] for component in processor_data + controller_services}
+    # Processors of skipped versioned groups are only known from their status
+    names.update((proc['id'], proc['name']) for proc in flow_status['processors'] if proc['id'] in skipped_ids)
+    if scope is not None or skipped_groups:
+        bulletins = [bulletin for bulletin in bulletins if bulletin.get('sourceId') in names]
+    errors = component_errors(validation_errors, controller_services)
+    output_lines.extend(print_component_health(index_component_health(bulletins, errors, names)))
+
+    # Add extension bundles
+    output_lines.extend(print_extension_bundles(extension_index, processor_data, controller_services))
+
+    # Add runtime status
+    output_lines.extend(print_runtime_status(flow_status, validation_errors))
+
+    return output_lines, execute_sql_data
 
 if __name__ == "__main__":
     try:
@@ -296,38 +1226,48 @@ if __name__ == "__main__":
             print("\n➡️ Exiting the program... Goodbye!")
             time.sleep(2)
             sys.exit(0)
-        print("Generating Report .....")
         is_backup = choice == "2"
 
-        token = get_token()
-        root_process_groups = get_root_process_groups(token)
-        total_root = len(root_process_groups)
-
-        output_lines = [f"Total number of process groups at root: {total_root}\n"]
-        execute_sql_data = []
-        scheduling_data = []
-
-        for idx, pg in enumerate(root_process_groups, start=1):
-            pg_id = pg['component']['id']
-            pg_name = pg['component']['name']
-            pg_info = get_pg_info(token, pg_id, pg_name)
-
-            output_lines.extend(print_pg_info(pg_info, index=idx))
-            output_lines.append("")
+        scope = None
+        if input("Capture the complete flow? (Y/n): ").strip().lower() == "n":
+            print("Leave a filter blank to skip it. Separate multiple values with commas.")
+            include = parse_scope_patterns(input("  Include process groups (IDs or path globs, e.g. Root > TenantA*): "))
+            exclude = parse_scope_patterns(input("  Exclude process groups (IDs or path globs): "))
+            processor_types = parse_scope_patterns(input("  Processor types (globs, e.g. *ExecuteSQL*): "))
+            scope = build_scope(include, exclude, processor_types)
+        skip_versioned = input("Skip the contents of versioned groups that are up to date with the registry? (y/N): ").strip().lower() == "y"
+        print("Generating Report .....")
 
-            execute_sql_data.extend(find_execute_sql_processors(pg_info, token, path="Root"))
-            scheduling_data.extend(collect_all_processors_scheduling(pg_info, token, path="Root"))
+        token = get_token()
+        fingerprints = None
+        try:
+            payloads = get_precheck_payloads(token)
+            fingerprints = build_precheck_fingerprints(payloads)
+        except Exception as e:
+            print(f"⚠️ Precheck fingerprint unavailable, continuing with a full capture: {e}")
 
-        # Add parameter context
-        root_parameter_context = get_root_parameter_context(token)
-        output_lines.extend(print_root_parameter_context(root_parameter_context))
+        # Fast path: compare with the latest Pre-validation fingerprint and crawl only what moved
+        if fingerprints and scope is None and not is_backup and REPORT_PREFIX != BASELINE_REPORT_PREFIX:
+            baseline_report, baseline = latest_baseline(ensure_reports_directory())
+            changed = changed_root_groups(baseline, fingerprints) if baseline else None
+            if changed == []:
+                print(f"\n✅ No drift: the flow matches the fingerprint of '{baseline_report}', saving its content without crawling")
+                save_no_drift_report(baseline_report, fingerprints, payloads)
+                sys.exit(0)
+            if changed:
+                print(f"➡️ Precheck: {len(changed)} of {len(fingerprints['groups'])} root group(s) differ from '{baseline_report}', crawling only those")
+                # Include by escaped path rather than ID, so no extra lookup is needed per group
+                scope = build_scope([glob.escape(f"Root > {fingerprints['names'].get(pg_id, pg_id)}") for pg_id in changed], [], [])
 
-        # Add scheduling information
-        output_lines.extend(print_scheduling_info(scheduling_data))
+        output_lines, execute_sql_data = build_report(token, scope, skip_versioned)
 
         # Save main report
         full_report = "\n".join(output_lines)
-        save_output_to_file(full_report, is_backup=is_backup)
+        report_path = save_output_to_file(full_report, is_backup=is_backup)
+        # Sharded snapshot next to the report, so Compare can load only the root groups that changed
+        write_snapshot(parse_report_lines(full_report.split("\n")), snapshot_path_for(report_path))
+        if fingerprints:
+            save_fingerprints(report_path, fingerprints, scoped=scope is not None)
 
         # Save ExecuteSQL report
         save_detailed_execute_sql(execute_sql_data, is_backup=is_backup)
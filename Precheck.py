@@ -0,0 +1,55 @@
+import json
+import os
+
+from Compare import list_files_with_prefix
+
+####### Fast-path precheck
+# Every report gets a small fingerprint file next to it. A later capture fingerprints the live
+# flow from a handful of bulk calls and only deep-crawls the root groups whose fingerprint moved.
+
+FINGERPRINT_EXTENSION = ".fingerprint.json"
+BASELINE_REPORT_PREFIX = "Nifi_Pre_Validation_Report_"
+BASELINE_DETAILED_PREFIX = "Nifi_Pre_Validation_Detailed_Report_"
+
+def fingerprint_path_for(report_path):
+    """Fingerprint file that sits next to a text report"""
+    return os.path.splitext(report_path)[0] + FINGERPRINT_EXTENSION
+
+def save_fingerprints(report_path, fingerprints, scoped):
+    with open(fingerprint_path_for(report_path), "w", encoding="utf-8") as f:
+        json.dump({**fingerprints, "scoped": scoped}, f, indent=2, sort_keys=True)
+
+def latest_baseline(reports_dir):
+    """Return (report path, fingerprints) of the newest complete-flow Pre-validation report, or (None, None)"""
+    candidates = []
+    for name in list_files_with_prefix(reports_dir, BASELINE_REPORT_PREFIX):
+        report_path = os.path.join(reports_dir, name)
+        if name.endswith(".txt") and os.path.exists(fingerprint_path_for(report_path)):
+            candidates.append(report_path)
+
+    for report_path in sorted(candidates, key=os.path.getmtime, reverse=True):
+        with open(fingerprint_path_for(report_path), "r", encoding="utf-8") as f:
+            fingerprints = json.load(f)
+        if not fingerprints.get("scoped"):
+            return report_path, fingerprints
+    return None, None
+
+def baseline_detailed_report(report_path):
+    """The Detailed ExecuteSQL report saved with a baseline report: the first one after it, before the next report"""
+    reports_dir = os.path.dirname(report_path)
+    saved = os.path.getmtime(report_path)
+    later_reports = [os.path.getmtime(os.path.join(reports_dir, name))
+                     for name in list_files_with_prefix(reports_dir, BASELINE_REPORT_PREFIX) if name.endswith(".txt")]
+    next_saved = min((mtime for mtime in later_reports if mtime > saved), default=None)
+    candidates = [os.path.join(reports_dir, name) for name in list_files_with_prefix(reports_dir, BASELINE_DETAILED_PREFIX)
+                  if name.endswith(".txt")]
+    candidates = [path for path in candidates
+                  if os.path.getmtime(path) >= saved and (next_saved is None or os.path.getmtime(path) < next_saved)]
+    return min(candidates, key=os.path.getmtime, default=None)
+
+def changed_root_groups(baseline, current):
+    """Root group IDs whose fingerprint moved; None when the root level changed or a group disappeared"""
+    if baseline["root"] != current["root"] or set(baseline["groups"]) - set(current["groups"]):
+        return None
+    return sorted(pg_id for pg_id, fingerprint in current["groups"].items()
+                  if baseline["groups"].get(pg_id) != fingerprint)
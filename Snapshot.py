@@ -0,0 +1,665 @@
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import re
+import sys
+import shutil
+import tempfile
+import fnmatch
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
+####### Keyed snapshot records
+# A snapshot is a stream of (key, fields) records where key is "<kind>|<component id>"
+# and fields is a flat dict of strings, so two snapshots can be merge-joined by key.
+
+SNAPSHOT_EXTENSION = ".snapshot.jsonl"
+MANIFEST_EXTENSION = ".snapshot.manifest.json"
+SHARDS_EXTENSION = ".snapshot.shards"
+# Bumped whenever the parser yields records earlier snapshots lack, so those are rebuilt from their text report
+SNAPSHOT_FORMAT = 2
+FLOW_SHARD = "flow"
+RUNTIME_SHARD = "runtime"
+DETAIL_SHARD_SUFFIX = "/detail"
+RUNTIME_KINDS = ("processor_status", "connection_status", "health")
+PARALLEL_READ_BYTES = 8 * 1024 * 1024
+CHUNK_RECORDS = 50000
+MAX_OPEN_CHUNKS = 64
+IGNORED_FIELDS = {"processor_status": {"Active Threads"}}
+
+SECTION_KINDS = {
+    "Below are the Parameter Context Info": "parameter",
+    "Below are the Scheduling Info": "scheduling",
+    "Below are the Controller Services Info": "controller_service",
+    "Below are the Connections Info": "connection",
+    "Below are the Processor Properties Info": "processor_properties",
+    "Below are the Extension Bundles Info": "bundle",
+    "Below are the Component Health Info": "health",
+    "Below are the Runtime Status Info": "status",
+    "ExecuteSQL Processor SQL Pre/Post-Query Report": "execute_sql",
+}
+
+def _block_key(kind, block):
+    """Build the record key for a finished report block"""
+    if kind in ("scheduling", "execute_sql"):
+        return f"{kind}|{block.get('Processor ID', block.get('Path', ''))}|{block.get('Processor Name', '')}"
+    return f"{kind}|{block['ID']}"
+
+RE_SECTION = re.compile("|".join(re.escape(marker) for marker in SECTION_KINDS))
+RE_PROCESS_GROUP = re.compile(r"^(?:\d+\.\s+|➔ )(.*?)\s+\(ID:\s*(.*)\)$")
+RE_DIRECT_PROCESSORS = re.compile(r"^- Direct processors inside: \d+ \[(.*)\]$")
+RE_VERSION_CONTROL = re.compile(r"^- Version Control: (.*) v(\S+) \[(\w+)\] \(Registry: (.*?), Bucket: (.*?), Flow ID: (.*?)\)( - contents not captured)?$")
+RE_PROCESSOR_ENTRY = re.compile(r"\s*(?:,\s*)?(.*?)\s+\(ID:\s*([^)]*)\)")
+RE_PARAMETER_CONTEXT = re.compile(r"^Parameter Context Name:\s*(.*?)\s*\(ID:\s*(.*)\)$")
+RE_SCOPE = re.compile(r"^Capture Scope (Path|Excluded Path|Processor Types):\s*(.*)$")
+RE_ENTRY = re.compile(r"^(Component Health|Controller Service|Connection|Extension Bundle|Processor Properties|Processor Status|Connection Status):\s+(.*?)\s+\(ID:\s*(.*)\)$")
+
+def parse_report_lines(lines):
+    """Tokenize report lines into (key, fields) records in a single pass with precompiled patterns"""
+    section = None
+    block = None
+    block_kind = None
+    param_context = None
+    group_stack = []
+    group_id = None
+    seen_sections = set()
+
+    for raw_line in lines:
+        line = raw_line.strip()
+        if not line:
+            continue
+        first = line[0]
+
+        # Section headers are the only lines starting with "----" or "===" that name a section
+        if first == "=" or (first == "-" and line.startswith("----")):
+            header = RE_SECTION.search(line)
+            if header or block is not None:
+                if block:
+                    yield _block_key(block_kind, block), block
+                block, block_kind = None, None
+            if header:
+                section = SECTION_KINDS[header.group(0)]
+                # Marks the section as captured even when it lists nothing, so a comparison can tell
+                # an empty section from one an older report never had
+                if section not in seen_sections:
+                    seen_sections.add(section)
+                    yield f"section|{section}", {"Value": header.group(0)}
+            continue
+
+        if section is None:
+            if first == "-":
+                match = RE_DIRECT_PROCESSORS.match(line)
+                if match:
+                    group_path = " > ".join(["Root"] + group_stack)
+                    for name, proc_id in RE_PROCESSOR_ENTRY.findall(match.group(1)):
+                        yield f"processor|{proc_id}", {"Name": name, "Path": group_path}
+                    continue
+                match = RE_VERSION_CONTROL.match(line)
+                if match:
+                    yield f"version_control|{group_id}", {
+                        "Path": " > ".join(["Root"] + group_stack), "Flow Name": match.group(1),
+                        "Version": match.group(2), "State": match.group(3), "Registry": match.group(4),
+                        "Bucket": match.group(5), "Flow ID": match.group(6),
+                        "Contents": "not captured" if match.group(7) else "captured"}
+            elif first == "➔" or first.isdigit():
+                match = RE_PROCESS_GROUP.match(line)
+                if match:
+                    # Child groups are indented three spaces per level below their root group
+                    depth = (len(raw_line) - len(raw_line.lstrip())) // 3 if first == "➔" else 0
+                    group_stack = group_stack[:depth] + [match.group(1)]
+                    group_id = match.group(2)
+                    kind = "Child Process Group" if first == "➔" else "Root Process Group"
+                    yield f"process_group|{match.group(2)}", {"Name": match.group(1), "Kind": kind,
+                                                              "Path": " > ".join(["Root"] + group_stack)}
+            elif first == "C":
+                match = RE_SCOPE.match(line)
+                if match:
+                    scope_kind = match.group(1).lower().replace(" ", "_")
+                    yield f"scope|{scope_kind}|{match.group(2)}", {"Value": match.group(2)}
+            continue
+
+        if section == "parameter":
+            if first == "-" and param_context and line.startswith("- "):
+                key, sep, value = line[2:].partition(':')
+                if sep:
+                    yield f"parameter|{param_context}|{key.strip()}", {"Context": param_context, "Name": key.strip(), "Value": value.strip()}
+            elif first == "P":
+                match = RE_PARAMETER_CONTEXT.match(line)
+                if match:
+                    param_context = match.group(1)
+                    yield f"parameter_context|{match.group(2)}", {"Name": param_context}
+            continue
+
+        if first == "-":
+            if block is not None and line.startswith("- "):
+                key, sep, value = line[2:].partition(':')
+                if sep:
+                    block[f"Property '{key.strip()}'"] = value.strip()
+            continue
+
+        if first == "C" or first == "P" or first == "E":
+            match = RE_ENTRY.match(line)
+            if match:
+                if block:
+                    yield _block_key(block_kind, block), block
+                block_kind = section
+                if section == "status":
+                    block_kind = "processor_status" if match.group(1) == "Processor Status" else "connection_status"
+                block = {"Name": match.group(2), "ID": match.group(3).strip()}
+                continue
+            if line.startswith("Path: "):
+                if block:
+                    yield _block_key(block_kind, block), block
+                block, block_kind = {"Path": line[6:].strip()}, section
+                continue
+
+        if block is not None:
+            key, sep, value = line.partition(':')
+            value = value.strip()
+            if sep and value:
+                block[key.strip()] = value
+
+    if block:
+        yield _block_key(block_kind, block), block
+
+def iter_report_records(path):
+    """Stream records out of a text report without loading it into memory"""
+    with open(path, 'r', encoding='utf-8') as file:
+        yield from parse_report_lines(line.rstrip() for line in file)
+
+####### Capture scope
+def path_in_scope(path, scope_paths, excluded_paths):
+    """True when path is inside one of the scope paths (or there are none) and outside every excluded path"""
+    def under(prefixes):
+        return any(path == prefix or path.startswith(f"{prefix} > ") for prefix in prefixes)
+    return (not scope_paths or under(scope_paths)) and not under(excluded_paths)
+
+def read_scope(records):
+    """Return the capture scope a scoped report declares, or None for a complete-flow report"""
+    scope = {"path": [], "excluded_path": [], "processor_types": []}
+    for key, fields in records:
+        if key.startswith("scope|"):
+            scope_kind = key.split("|", 2)[1]
+            if scope_kind == "processor_types":
+                scope[scope_kind].extend(p.strip() for p in fields["Value"].split(",") if p.strip())
+            else:
+                scope[scope_kind].append(fields["Value"])
+    return scope if any(scope.values()) else None
+
+def filter_records_to_scope(records, scope):
+    """Drop records that fall outside a capture scope, applying the same rules the scoped capture used"""
+    def in_scope(path):
+        return path_in_scope(path, scope["path"], scope["excluded_path"])
+
+    def type_in_scope(processor_type):
+        return not scope["processor_types"] or any(fnmatch.fnmatchcase(processor_type, p) for p in scope["processor_types"])
+
+    group_paths = {}
+    typed_ids = set()
+    for key, fields in records:
+        kind = key.split("|", 1)[0]
+        if kind == "process_group":
+            group_paths[key.split("|", 1)[1]] = fields.get("Path", "")
+        elif kind == "scheduling" and type_in_scope(fields.get("Processor Type", "")):
+            typed_ids.add(fields.get("Processor ID"))
+
+    processor_ids = set()
+    connection_ids = set()
+    for key, fields in records:
+        kind, component_id = key.split("|", 1)
+        if kind == "processor" and in_scope(fields.get("Path", "")) and (not scope["processor_types"] or component_id in typed_ids):
+            processor_ids.add(component_id)
+        elif kind == "connection" and in_scope(fields.get("Path", "")):
+            connection_ids.add(component_id)
+    all_processor_ids = {key.split("|", 1)[1] for key, _ in records if key.startswith("processor|")}
+    all_connection_ids = {key.split("|", 1)[1] for key, _ in records if key.startswith("connection|")}
+
+    scoped = []
+    for key, fields in records:
+        kind, component_id = key.split("|", 1)
+        if kind == "process_group":
+            keep = in_scope(fields.get("Path", ""))
+        elif kind in ("processor", "processor_properties"):
+            keep = component_id in processor_ids
+        elif kind == "processor_status":
+            # Status of a processor without configuration comes from a skipped versioned group
+            parent = fields.get("Group ID")
+            keep = component_id in processor_ids or (component_id not in all_processor_ids and
+                                                     (parent not in group_paths or in_scope(group_paths[parent])))
+        elif kind == "scheduling" or kind == "execute_sql":
+            keep = fields.get("Processor ID") in processor_ids
+        elif kind == "connection":
+            keep = component_id in connection_ids
+        elif kind == "connection_status":
+            keep = component_id in connection_ids or component_id not in all_connection_ids
+        elif kind == "controller_service":
+            parent = fields.get("Parent Group ID")
+            referenced = re.findall(r"\(ID:\s*([^)]*)\)", fields.get("Referencing Processors", ""))
+            keep = (parent in group_paths and in_scope(group_paths[parent])) or any(ref in processor_ids for ref in referenced)
+        elif kind == "health":
+            keep = component_id in processor_ids or component_id not in all_processor_ids
+        else:
+            keep = True
+        if keep:
+            scoped.append((key, fields))
+    return scoped
+
+def drop_records_under(records, group_paths_to_drop):
+    """Drop the configuration inside the given process groups (the group records themselves are kept)
+
+    Runtime status and health stay: a matched registry version says nothing about whether its processors run.
+    """
+    def inside(path, strict=False):
+        return any((path == prefix and not strict) or path.startswith(f"{prefix} > ") for prefix in group_paths_to_drop)
+
+    group_paths = {}
+    processor_ids = set()
+    connection_ids = set()
+    for key, fields in records:
+        kind, component_id = key.split("|", 1)
+        if kind == "process_group":
+            group_paths[component_id] = fields.get("Path", "")
+        elif kind == "processor" and inside(fields.get("Path", "")):
+            processor_ids.add(component_id)
+        elif kind == "connection" and inside(fields.get("Path", "")):
+            connection_ids.add(component_id)
+
+    kept = []
+    for key, fields in records:
+        kind, component_id = key.split("|", 1)
+        if kind in ("process_group", "version_control"):
+            keep = not inside(fields.get("Path", ""), strict=True)
+        elif kind in ("processor", "processor_properties"):
+            keep = component_id not in processor_ids
+        elif kind == "scheduling" or kind == "execute_sql":
+            keep = fields.get("Processor ID") not in processor_ids
+        elif kind == "connection":
+            keep = component_id not in connection_ids
+        elif kind == "controller_service":
+            parent = fields.get("Parent Group ID")
+            keep = parent not in group_paths or not inside(group_paths[parent])
+        else:
+            keep = True
+        if keep:
+            kept.append((key, fields))
+    return kept
+
+####### External sort
+def _spill(records, workdir):
+    """Write an already sorted list of records to a chunk file and return its path"""
+    fd, path = tempfile.mkstemp(suffix=".chunk", dir=workdir)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    return path
+
+def _read_chunk(file_handle):
+    for line in file_handle:
+        key, fields = json.loads(line)
+        yield key, fields
+
+def _merge_chunks(paths):
+    """Yield records from sorted chunk files in key order, closing them when exhausted"""
+    with ExitStack() as stack:
+        files = [stack.enter_context(open(p, 'r', encoding='utf-8')) for p in paths]
+        yield from heapq.merge(*[_read_chunk(f) for f in files], key=lambda record: record[0])
+
+def external_sort(records, workdir, chunk_records=CHUNK_RECORDS):
+    """Sort records by key holding at most chunk_records in memory, spilling sorted runs to workdir"""
+    chunk_paths = []
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_records:
+            chunk.sort(key=lambda r: r[0])
+            chunk_paths.append(_spill(chunk, workdir))
+            chunk = []
+    if chunk:
+        chunk.sort(key=lambda r: r[0])
+        chunk_paths.append(_spill(chunk, workdir))
+
+    # Collapse runs in batches so the final merge never holds too many files open
+    while len(chunk_paths) > MAX_OPEN_CHUNKS:
+        batch, chunk_paths = chunk_paths[:MAX_OPEN_CHUNKS], chunk_paths[MAX_OPEN_CHUNKS:]
+        chunk_paths.append(_spill(_merge_chunks(batch), workdir))
+        for path in batch:
+            os.remove(path)
+
+    return _merge_chunks(chunk_paths)
+
+def _dedupe(sorted_records):
+    """Keep the last record of each run of equal keys"""
+    previous = None
+    for record in sorted_records:
+        if previous is not None and previous[0] != record[0]:
+            yield previous
+        previous = record
+    if previous is not None:
+        yield previous
+
+def merge_join(good_sorted, bad_sorted):
+    """Join two key-sorted record streams, yielding (key, good_fields, bad_fields) with None for a missing side"""
+    good_iter = _dedupe(good_sorted)
+    bad_iter = _dedupe(bad_sorted)
+    good = next(good_iter, None)
+    bad = next(bad_iter, None)
+
+    while good is not None or bad is not None:
+        if bad is None or (good is not None and good[0] < bad[0]):
+            yield good[0], good[1], None
+            good = next(good_iter, None)
+        elif good is None or bad[0] < good[0]:
+            yield bad[0], None, bad[1]
+            bad = next(bad_iter, None)
+        else:
+            yield good[0], good[1], bad[1]
+            good = next(good_iter, None)
+            bad = next(bad_iter, None)
+
+def field_differences(kind, good_fields, bad_fields):
+    """List (field, good value, bad value) for fields that differ, skipping volatile ones"""
+    ignored = IGNORED_FIELDS.get(kind, set())
+    return [(field, good_fields.get(field), bad_fields.get(field))
+            for field in sorted(set(good_fields) | set(bad_fields))
+            if field not in ignored and good_fields.get(field) != bad_fields.get(field)]
+
+def stream_compare(good_records, bad_records, file_handle, workdir=None, chunk_records=CHUNK_RECORDS):
+    """Sort both record streams on disk and write their differences in one merge pass; returns counts per kind"""
+    counts = {}
+    with tempfile.TemporaryDirectory(prefix="nifi_sort_", dir=workdir) as sort_dir:
+        good_sorted = external_sort(good_records, sort_dir, chunk_records)
+        bad_sorted = external_sort(bad_records, sort_dir, chunk_records)
+
+        current_kind = None
+        for key, good_fields, bad_fields in merge_join(good_sorted, bad_sorted):
+            kind, component = key.split("|", 1)
+            if kind != current_kind:
+                current_kind = kind
+                counts.setdefault(kind, 0)
+                file_handle.write(f"=== {kind.replace('_', ' ').title()} Differences ===\n")
+
+            name = (good_fields or bad_fields).get("Name", "")
+            if good_fields is None:
+                counts[kind] += 1
+                file_handle.write(f"  - Missing in Post-validation: {component} {name}\n")
+            elif bad_fields is None:
+                counts[kind] += 1
+                file_handle.write(f"  - New in Post-validation: {component} {name}\n")
+            else:
+                differences = field_differences(kind, good_fields, bad_fields)
+                if differences:
+                    counts[kind] += 1
+                    file_handle.write(f"  {component} {name}\n")
+                    for field, good_val, bad_val in differences:
+                        file_handle.write(f"    - {field}: Post-validation = {good_val} | Pre-validation = {bad_val}\n")
+
+    return counts
+
+####### Structured snapshot files
+# A snapshot is two shards per root process group, "structure" (groups, processors, scheduling:
+# everything compared by name) and "detail" (configuration compared by ID), plus a "flow" shard for
+# flow-wide records and a "runtime" shard for status and health, which change between any two captures.
+# Shards are key-sorted and concatenated into a .snapshot.shards file. The manifest records every
+# shard's offset, length and sha256, so a reader can memory-map the file and decode only the shards it needs.
+
+def snapshot_path_for(report_path):
+    """Snapshot manifest that sits next to a text report"""
+    return os.path.splitext(report_path)[0] + MANIFEST_EXTENSION
+
+def legacy_snapshot_path_for(report_path):
+    """Single key-sorted snapshot file written by earlier versions"""
+    return os.path.splitext(report_path)[0] + SNAPSHOT_EXTENSION
+
+def fresh_snapshot(report_path):
+    """Manifest of an up-to-date sharded snapshot of the report in the current format, or None"""
+    manifest_path = snapshot_path_for(report_path)
+    if not os.path.exists(manifest_path) or os.path.getmtime(manifest_path) < os.path.getmtime(report_path):
+        return None
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        if json.load(f).get("format") != SNAPSHOT_FORMAT:
+            return None
+    return manifest_path
+
+def read_manifest(manifest_path):
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    manifest["data_path"] = os.path.join(os.path.dirname(manifest_path), manifest["data"])
+    return manifest
+
+def _iter_shard_lines(view, start, end):
+    position = start
+    while position < end:
+        newline = view.find(b"\n", position, end)
+        newline = end if newline == -1 else newline + 1
+        key, fields = json.loads(view[position:newline])
+        yield key, fields
+        position = newline
+
+def read_shard(data_path, entry):
+    """Decode one shard through a memory map of the shard file, checking it against its manifest hash"""
+    if not entry["length"]:
+        return []
+    with open(data_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        data = view[entry["offset"]:entry["offset"] + entry["length"]]
+    if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+        raise Exception(f"Snapshot shard at offset {entry['offset']} of {data_path} does not match its manifest")
+    return [(key, fields) for key, fields in map(json.loads, data.splitlines())]
+
+def load_shards(manifest, shard_ids, workers=None):
+    """Read the given shards, in parallel across cores when there is enough data to be worth it"""
+    entries = [manifest["shards"][shard] for shard in shard_ids]
+    if len(entries) > 1 and sum(entry["length"] for entry in entries) >= PARALLEL_READ_BYTES:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            shards = list(executor.map(read_shard, [manifest["data_path"]] * len(entries), entries))
+    else:
+        shards = [read_shard(manifest["data_path"], entry) for entry in entries]
+    return dict(zip(shard_ids, shards))
+
+def shard_in_scope(entry, scope):
+    """True when some part of a root group shard can fall inside a capture scope"""
+    path = entry["path"]
+    if scope is None or not path:
+        return True
+    if any(path == excluded or path.startswith(f"{excluded} > ") for excluded in scope["excluded_path"]):
+        return False
+    return not scope["path"] or any(path_in_scope(path, [scope_path], []) or scope_path.startswith(f"{path} > ")
+                                    for scope_path in scope["path"])
+
+def load_changed_shards(good_manifest_path, bad_manifest_path):
+    """Records of both snapshots, leaving out the detail shards whose hashes are identical and shards outside the scope
+
+    Names are compared as sets across the whole flow, so every shard holding names is always loaded;
+    only ID-keyed configuration can be left out, since an identical shard yields identical IDs on both sides.
+    """
+    good_manifest = read_manifest(good_manifest_path)
+    bad_manifest = read_manifest(bad_manifest_path)
+    good_flow = load_shards(good_manifest, [FLOW_SHARD])[FLOW_SHARD]
+    bad_flow = load_shards(bad_manifest, [FLOW_SHARD])[FLOW_SHARD]
+    scopes = [scope for scope in (read_scope(good_flow), read_scope(bad_flow)) if scope]
+
+    good_records, bad_records = list(good_flow), list(bad_flow)
+    for manifest, other, records in ((good_manifest, bad_manifest, good_records), (bad_manifest, good_manifest, bad_records)):
+        needed = [shard for shard, entry in sorted(manifest["shards"].items())
+                  if shard != FLOW_SHARD
+                  and (entry.get("part") != "detail" or entry["sha256"] != other["shards"].get(shard, {}).get("sha256"))
+                  and all(shard_in_scope(entry, scope) for scope in scopes)]
+        for shard_records in load_shards(manifest, needed).values():
+            records.extend(shard_records)
+    return good_records, bad_records
+
+def iter_snapshot_records(path):
+    """Stream records in key order from a sharded snapshot (or a legacy single-file snapshot)"""
+    if path.endswith(SNAPSHOT_EXTENSION):
+        with open(path, 'r', encoding='utf-8') as file:
+            yield from _read_chunk(file)
+        return
+
+    manifest = read_manifest(path)
+    if not os.path.getsize(manifest["data_path"]):
+        return
+    with open(manifest["data_path"], 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        shards = [_iter_shard_lines(view, entry["offset"], entry["offset"] + entry["length"])
+                  for entry in manifest["shards"].values()]
+        yield from heapq.merge(*shards, key=lambda record: record[0])
+
+def iter_records(path):
+    """Stream records from a snapshot, or from a text report via its converted snapshot when up to date"""
+    if path.endswith(MANIFEST_EXTENSION) or path.endswith(SNAPSHOT_EXTENSION):
+        return iter_snapshot_records(path)
+    manifest_path = fresh_snapshot(path)
+    if manifest_path:
+        return iter_snapshot_records(manifest_path)
+    legacy_path = legacy_snapshot_path_for(path)
+    if os.path.exists(legacy_path) and os.path.getmtime(legacy_path) >= os.path.getmtime(path):
+        return iter_snapshot_records(legacy_path)
+    return iter_report_records(path)
+
+def detail_shard(shard):
+    return shard if shard == FLOW_SHARD else shard + DETAIL_SHARD_SUFFIX
+
+def assign_shards(records, shards):
+    """Tag each record with the shard it belongs to: its root group's structure or detail shard, the runtime
+    shard, or the flow shard for flow-wide records
+
+    Relies on report order: groups and processors come before the sections that refer to them by ID.
+    """
+    root_groups = {}
+    component_shards = {}
+
+    def shard_of_path(path):
+        return root_groups.get(" > ".join(path.split(" > ")[:2]), FLOW_SHARD)
+
+    for key, fields in records:
+        kind, component_id = key.split("|", 1)
+        if kind == "process_group" and fields.get("Kind") == "Root Process Group":
+            root_groups[fields["Path"]] = component_id
+            shards[component_id] = {"name": fields["Name"], "path": fields["Path"], "part": "structure"}
+            shards[detail_shard(component_id)] = {"name": fields["Name"], "path": fields["Path"], "part": "detail"}
+        if kind in RUNTIME_KINDS:
+            shard = RUNTIME_SHARD
+        elif kind in ("process_group", "processor", "version_control"):
+            shard = component_shards[component_id] = shard_of_path(fields.get("Path", ""))
+        elif kind in ("scheduling", "execute_sql"):
+            shard = component_shards.get(fields.get("Processor ID")) or shard_of_path(fields.get("Path", ""))
+        elif kind == "connection":
+            shard = detail_shard(shard_of_path(fields.get("Path", "")))
+        elif kind == "processor_properties":
+            shard = detail_shard(component_shards.get(component_id, FLOW_SHARD))
+        elif kind == "controller_service":
+            shard = detail_shard(component_shards.get(fields.get("Parent Group ID"), FLOW_SHARD))
+        else:
+            shard = FLOW_SHARD
+        yield shard, (key, fields)
+
+def write_shard(spill_path, part_path, workdir, chunk_records=CHUNK_RECORDS):
+    """Sort one shard's spilled records into a part file; returns (length, sha256, record count)"""
+    digest = hashlib.sha256()
+    length = count = 0
+    with open(spill_path, 'r', encoding='utf-8') as spill, open(part_path, 'wb') as part:
+        for record in external_sort(_read_chunk(spill), workdir, chunk_records):
+            line = (json.dumps(record) + "\n").encode("utf-8")
+            part.write(line)
+            digest.update(line)
+            length += len(line)
+            count += 1
+    return length, digest.hexdigest(), count
+
+def write_snapshot(records, manifest_path, chunk_records=CHUNK_RECORDS, workers=None):
+    """Write records as sorted structure and detail shards per root process group plus a manifest; shards are sorted in parallel"""
+    workdir = os.path.dirname(os.path.abspath(manifest_path))
+    data_path = manifest_path[:-len(MANIFEST_EXTENSION)] + SHARDS_EXTENSION
+    shards = {FLOW_SHARD: {"name": "", "path": "", "part": "flow"}, RUNTIME_SHARD: {"name": "", "path": "", "part": "runtime"}}
+
+    with tempfile.TemporaryDirectory(prefix="nifi_sort_", dir=workdir) as sort_dir:
+        spill_paths = {FLOW_SHARD: os.path.join(sort_dir, "spill-0")}
+        buffered, pending = {}, 0
+
+        def flush():
+            for shard, shard_records in buffered.items():
+                if shard not in spill_paths:
+                    spill_paths[shard] = os.path.join(sort_dir, f"spill-{len(spill_paths)}")
+                with open(spill_paths[shard], 'a', encoding='utf-8') as f:
+                    for record in shard_records:
+                        f.write(json.dumps(record) + "\n")
+            buffered.clear()
+
+        for shard, record in assign_shards(records, shards):
+            buffered.setdefault(shard, []).append(record)
+            pending += 1
+            if pending >= chunk_records:
+                flush()
+                pending = 0
+        flush()
+        open(spill_paths[FLOW_SHARD], 'a').close()
+
+        order = sorted(spill_paths)
+        part_paths = [spill_paths[shard] + ".part" for shard in order]
+        arguments = ([spill_paths[shard] for shard in order], part_paths, [sort_dir] * len(order), [chunk_records] * len(order))
+        if workers == 1 or len(order) == 1:
+            results = list(map(write_shard, *arguments))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(write_shard, *arguments))
+
+        manifest = {"data": os.path.basename(data_path), "format": SNAPSHOT_FORMAT, "shards": {}}
+        offset = 0
+        with open(data_path + ".tmp", 'wb') as data:
+            for shard, part_path, (length, digest, count) in zip(order, part_paths, results):
+                with open(part_path, 'rb') as part:
+                    shutil.copyfileobj(part, data)
+                manifest["shards"][shard] = {**shards.get(shard, {"name": "", "path": ""}),
+                                             "offset": offset, "length": length, "sha256": digest, "records": count}
+                offset += length
+
+    # Shard hashes are checked on read, so a crash between these two replaces cannot go unnoticed
+    os.replace(data_path + ".tmp", data_path)
+    with open(manifest_path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return manifest_path
+
+def convert_report(report_path):
+    """Convert one legacy text report into a sharded snapshot"""
+    return write_snapshot(iter_report_records(report_path), snapshot_path_for(report_path), workers=1)
+
+def convert_reports_directory(reports_dir, workers=None):
+    """Convert every .txt/.archive report without an up-to-date snapshot, in parallel across cores"""
+    pending = []
+    for name in sorted(os.listdir(reports_dir)):
+        if not name.startswith("Nifi_") or not (name.endswith(".txt") or name.endswith(".archive")):
+            continue
+        report_path = os.path.join(reports_dir, name)
+        if not fresh_snapshot(report_path):
+            pending.append(report_path)
+
+    converted, failed = [], []
+    if not pending:
+        return converted, failed
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {report_path: executor.submit(convert_report, report_path) for report_path in pending}
+        for report_path, future in futures.items():
+            try:
+                converted.append(future.result())
+            except Exception as e:
+                failed.append((report_path, str(e)))
+    return converted, failed
+
+def main():
+    reports_dir = sys.argv[1] if len(sys.argv) > 1 else "Reports"
+    if not os.path.isdir(reports_dir):
+        print(f"❌ Directory not found: {reports_dir}")
+        sys.exit(1)
+
+    print(f"Converting reports in '{reports_dir}' to snapshots .....")
+    converted, failed = convert_reports_directory(reports_dir)
+    for snapshot_path in converted:
+        print(f"✅ {snapshot_path}")
+    for report_path, error in failed:
+        print(f"❌ {report_path}: {error}")
+    print(f"\nConverted: {len(converted)} | Failed: {len(failed)}")
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,29 @@ import sys
 import time
 import os
 import glob
+import re
+import hashlib
+from functools import lru_cache
 from datetime import datetime
 
+from Compare_Cache import cache_key, file_digest, restore, store
+from Snapshot import iter_report_records
+
+SQL_FIELDS = ("SQL Pre-Query", "SQL Post-Query")
+EMPTY_SQL_VALUES = {"", "None", "Not Set"}
+
+# NiFi Expression Language and quoted text keep their case; comments and whitespace are dropped
+RE_SQL_TOKEN = re.compile(r"""
+    (?P<comment>--[^\n]*|/\*.*?\*/)
+  | (?P<expression>\$\{[^}]*\})
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<quoted>"(?:[^"]|"")*"|`[^`]*`)
+  | (?P<word>[A-Za-z_][A-Za-z0-9_$#]*)
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<space>\s+)
+  | (?P<symbol><>|!=|<=|>=|\|\||::|.)
+""", re.S | re.X)
+
 def list_files(pattern):
     """List files in the current directory matching the given pattern."""
     return sorted(glob.glob(pattern))
@@ -73,6 +94,104 @@ def compare_files(pre_validation_file, post_validation_file, output_file):
         print(f"Error writing to output file: {e}")
         sys.exit(1)
 
+@lru_cache(maxsize=65536)
+def normalize_sql(sql):
+    """Canonical token tuple of a SQL text: no comments or whitespace, unquoted words upper-cased, no trailing semicolons"""
+    if sql.strip() in EMPTY_SQL_VALUES:
+        return ()
+    tokens = []
+    for match in RE_SQL_TOKEN.finditer(sql):
+        kind = match.lastgroup
+        if kind in ("comment", "space"):
+            continue
+        tokens.append(match.group().upper() if kind == "word" else match.group())
+    while tokens and tokens[-1] == ";":
+        tokens.pop()
+    return tuple(tokens)
+
+@lru_cache(maxsize=65536)
+def sql_fingerprint(sql):
+    """Hash of the canonical form; statements shared by many processors are normalized and hashed once"""
+    return hashlib.sha256("\x1f".join(normalize_sql(sql)).encode("utf-8")).hexdigest()
+
+def report_sql(value):
+    """SQL text of a detailed report value; reports write line breaks as \\n to keep each value on one line"""
+    return value.replace("\\n", "\n")
+
+def load_execute_sql(file_path):
+    """Map processor ID to its ExecuteSQL block from a detailed report (SQL values as written, line breaks escaped)"""
+    try:
+        return {fields.get("Processor ID"): fields for _, fields in iter_report_records(file_path)}
+    except FileNotFoundError:
+        print(f"Error: File '{file_path}' not found.")
+        sys.exit(1)
+
+def token_changes(pre_tokens, post_tokens):
+    """Token-level edit script between two canonical statements"""
+    changes = []
+    matcher = difflib.SequenceMatcher(a=pre_tokens, b=post_tokens, autojunk=False)
+    for tag, pre_start, pre_end, post_start, post_end in matcher.get_opcodes():
+        if tag in ("delete", "replace"):
+            changes.append("- " + " ".join(pre_tokens[pre_start:pre_end]))
+        if tag in ("insert", "replace"):
+            changes.append("+ " + " ".join(post_tokens[post_start:post_end]))
+    return changes
+
+def compare_files_normalized(pre_validation_file, post_validation_file, output_file):
+    """Compare ExecuteSQL queries by canonical SQL, diffing only statements whose fingerprints differ"""
+    pre_blocks = load_execute_sql(pre_validation_file)
+    post_blocks = load_execute_sql(post_validation_file)
+    cosmetic = 0
+    changed = 0
+
+    try:
+        with open(output_file, 'w', encoding='utf-8') as file:
+            file.write("=== SQL-Normalized Differences between Pre-Validation and Post-Validation Files ===\n\n")
+            file.write(f"Pre-Validation File: {pre_validation_file}\n")
+            file.write(f"Post-Validation File: {post_validation_file}\n\n")
+            file.write("Whitespace, comments, keyword/identifier case and trailing semicolons are ignored.\n\n")
+
+            for proc_id in sorted(set(pre_blocks) - set(post_blocks)):
+                file.write(f"Missing in Post-Validation: {pre_blocks[proc_id].get('Processor Name')} (ID: {proc_id})\n")
+            for proc_id in sorted(set(post_blocks) - set(pre_blocks)):
+                file.write(f"New in Post-Validation: {post_blocks[proc_id].get('Processor Name')} (ID: {proc_id})\n")
+
+            for proc_id in sorted(set(pre_blocks) & set(post_blocks)):
+                pre_block, post_block = pre_blocks[proc_id], post_blocks[proc_id]
+                differences = []
+                for field in SQL_FIELDS:
+                    pre_sql, post_sql = pre_block.get(field, ""), post_block.get(field, "")
+                    if pre_sql == post_sql:
+                        continue
+                    # A "--" comment ends at a line break, so the SQL is only normalized once they are restored
+                    if sql_fingerprint(report_sql(pre_sql)) == sql_fingerprint(report_sql(post_sql)):
+                        cosmetic += 1
+                        continue
+                    differences.append((field, pre_sql, post_sql))
+
+                if differences:
+                    changed += len(differences)
+                    file.write(f"\nPath: {post_block.get('Path')}\n")
+                    file.write(f"  Processor: {post_block.get('Processor Name')} (ID: {proc_id})\n")
+                    for field, pre_sql, post_sql in differences:
+                        file.write(f"    - {field}:\n")
+                        file.write(f"        Pre-Validation  : {pre_sql}\n")
+                        file.write(f"        Post-Validation : {post_sql}\n")
+                        for change in token_changes(normalize_sql(report_sql(pre_sql)), normalize_sql(report_sql(post_sql))):
+                            file.write(f"          {change}\n")
+
+            file.write("\n=== Summary ===\n")
+            file.write(f"Processors compared: {len(set(pre_blocks) & set(post_blocks))}\n")
+            file.write(f"Missing in Post-Validation: {len(set(pre_blocks) - set(post_blocks))}\n")
+            file.write(f"New in Post-Validation: {len(set(post_blocks) - set(pre_blocks))}\n")
+            file.write(f"Statements with SQL differences: {changed}\n")
+            file.write(f"Cosmetic-only differences ignored: {cosmetic}\n")
+
+        print(f"\nDifferences written to {output_file}")
+    except Exception as e:
+        print(f"Error writing to output file: {e}")
+        sys.exit(1)
+
 def main():
     # Define file patterns
     pre_validation_pattern = "Nifi_Pre_Validation_Detailed_Report_*"
@@ -88,12 +207,28 @@ def main():
     # Display and select Post-Validation file
     post_validation_file = display_and_select_files(post_validation_files, "Post-Validation")
     
+    print("\nComparison mode:")
+    print("    1) Line by line (exact)")
+    print("    2) SQL-normalized (ignore whitespace, comments, case and trailing semicolons)")
+    mode = "normalized" if input("Enter your choice (1 or 2, default 1): ").strip() == "2" else "exact"
+
     # Generate output file name based on current date (DDMMYYYY)
     current_date = datetime.now().strftime("%d%m%Y")
     output_file = f"Nifi_Sql_Execute_Validation_Report_{current_date}.txt"
     
+    # Reuse the result of an earlier run on the same pair; the file names are part of the output
+    options = {"compare": "sql", "mode": mode, "files": [pre_validation_file, post_validation_file], "code": file_digest(__file__)}
+    key = cache_key([pre_validation_file, post_validation_file], options)
+    if restore(key, output_file) is not None:
+        print(f"\nSame Pre/Post pair as an earlier run, differences written to {output_file}")
+        return
+
     # Compare the files and generate output
-    compare_files(pre_validation_file, post_validation_file, output_file)
+    if mode == "normalized":
+        compare_files_normalized(pre_validation_file, post_validation_file, output_file)
+    else:
+        compare_files(pre_validation_file, post_validation_file, output_file)
+    store(key, output_file)
 
 if __name__ == "__main__":
     main()
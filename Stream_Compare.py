@@ -0,0 +1,58 @@
+import os
+import sys
+
+from Compare import ensure_reports_directory, list_files_with_prefix, prompt_user_to_choose_file
+from Snapshot import iter_records, stream_compare
+
+REPORT_PREFIXES = {
+    "1": ("Nifi_Post_Validation_Report_", "Nifi_Pre_Validation_Report_"),
+    "2": ("Nifi_Post_Validation_Detailed_Report_", "Nifi_Pre_Validation_Detailed_Report_"),
+}
+
+def main():
+    print("=== NiFi Pre vs Post Large Snapshot Comparison (bounded memory) ===\n")
+    print("Please choose the report type to compare:")
+    print("    1) Validation Report")
+    print("    2) Detailed ExecuteSQL Report")
+    choice = input("Enter your choice (1 or 2): ").strip()
+    if choice not in REPORT_PREFIXES:
+        print("❌ Invalid choice. Please enter valid number")
+        sys.exit(1)
+    post_prefix, pre_prefix = REPORT_PREFIXES[choice]
+
+    reports_dir = ensure_reports_directory()
+    good_file = prompt_user_to_choose_file(list_files_with_prefix(reports_dir, post_prefix), "Post-validation")
+    if not good_file:
+        return
+
+    bad_file = prompt_user_to_choose_file(list_files_with_prefix(reports_dir, pre_prefix), "Pre-validation")
+    if not bad_file:
+        return
+
+    try:
+        print("Comparing Reports .....")
+        report_path = os.path.join(reports_dir, "comparison_report_stream.txt")
+        with open(report_path, "w", encoding="utf-8") as report_file:
+            report_file.write("=== NiFi Pre vs Post Environment Validation Report (streaming) ===\n\n")
+            report_file.write(f"Post-validation File: {good_file}\n")
+            report_file.write(f"Pre-validation File: {bad_file}\n\n")
+            counts = stream_compare(iter_records(os.path.join(reports_dir, good_file)),
+                                    iter_records(os.path.join(reports_dir, bad_file)),
+                                    report_file, workdir=reports_dir)
+
+            report_file.write("\n=== Summary ===\n")
+            if not any(counts.values()):
+                report_file.write("✅ No differences found\n")
+            for kind, count in sorted(counts.items()):
+                report_file.write(f"{kind.replace('_', ' ').title()} differences: {count}\n")
+
+        print("\n✅ Comparison completed successfully")
+        print(f"📄 Report saved to '{report_path}'")
+
+    except FileNotFoundError as fe:
+        print(f"❌ File not found: {fe.filename}")
+    except Exception as e:
+        print(f"❌ Error while comparing files: {e}")
+
+if __name__ == "__main__":
+    main()
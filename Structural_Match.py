@@ -0,0 +1,186 @@
+import re
+from collections import defaultdict
+
+####### Structural matching of renamed or recreated components
+# Processors and process groups that exist on one side only (by ID) are paired by their
+# neighborhood instead of their name: Weisfeiler-Lehman style label refinement over the graph of
+# containment and connections. Each round folds the sorted labels of a node's neighbors into its
+# own label, so after k rounds a label summarizes the k-hop neighborhood. Pairs are taken from
+# labels that are unique on both sides, deepest round first. A pair is only accepted with some
+# evidence beyond its type: an already paired neighbor, paired parents, or the same name. Each
+# round is one pass over the nodes and edges, so the matching stays near-linear in the flow size.
+
+WL_ITERATIONS = 3
+RE_ENDPOINT_ID = re.compile(r"\(ID:\s*([^,)]+)")
+
+class FlowGraph:
+    def __init__(self):
+        self.nodes = {}
+        self.adjacency = defaultdict(list)
+
+    def node(self, component_id, kind):
+        return self.nodes.setdefault(component_id, {"Kind": kind, "Name": "", "Path": "", "Type": "", "properties": {}})
+
+def build_graph(records):
+    """Processor and process group nodes of one report, linked by containment and connections"""
+    graph = FlowGraph()
+    group_by_path = {}
+    service_types = {}
+    connections = []
+
+    for key, fields in records:
+        kind, component_id = key.split("|", 1)
+        if kind == "process_group":
+            node = graph.node(component_id, "Process Group")
+            node.update(Name=fields["Name"], Path=fields.get("Path", ""))
+            group_by_path[node["Path"]] = component_id
+        elif kind == "processor":
+            graph.node(component_id, "Processor").update(Name=fields["Name"], Path=fields.get("Path", ""))
+        elif kind == "scheduling" and fields.get("Processor ID"):
+            node = graph.node(fields["Processor ID"], "Processor")
+            node["Type"] = node["Type"] or fields.get("Processor Type", "")
+        elif kind == "processor_properties":
+            node = graph.node(component_id, "Processor")
+            node["Type"] = fields.get("Type", node["Type"])
+            node["properties"] = {field[len("Property '"):-1]: value
+                                  for field, value in fields.items() if field.startswith("Property '")}
+        elif kind == "controller_service":
+            service_types[component_id] = fields.get("Type", "")
+        elif kind == "connection":
+            connections.append(fields)
+
+    # Property values that point at a controller service change with its ID; compare the service type instead
+    for node in graph.nodes.values():
+        node["properties"] = {key: service_types.get(value, value) for key, value in node["properties"].items()}
+
+    for component_id, node in graph.nodes.items():
+        parent_path = node["Path"] if node["Kind"] == "Processor" else node["Path"].rpartition(" > ")[0]
+        parent_id = group_by_path.get(parent_path)
+        if parent_id and parent_id != component_id:
+            graph.adjacency[component_id].append(("parent", parent_id))
+            graph.adjacency[parent_id].append(("child", component_id))
+
+    for fields in connections:
+        source = RE_ENDPOINT_ID.search(fields.get("Source", ""))
+        destination = RE_ENDPOINT_ID.search(fields.get("Destination", ""))
+        if not source or not destination:
+            continue
+        source_id, destination_id = source.group(1).strip(), destination.group(1).strip()
+        if source_id in graph.nodes and destination_id in graph.nodes:
+            relationships = fields.get("Relationships", "")
+            graph.adjacency[source_id].append((f"out:{relationships}", destination_id))
+            graph.adjacency[destination_id].append((f"in:{relationships}", source_id))
+
+    return graph
+
+def coarse_label(node):
+    return (node["Kind"], node["Type"])
+
+def fine_label(node):
+    return (node["Kind"], node["Type"], tuple(sorted(node["properties"].items())))
+
+def refine(graph, labels, iterations):
+    """Labels after each refinement round: [round 0 (initial), round 1, ..., round iterations]"""
+    history = [labels]
+    for _ in range(iterations):
+        labels = {component_id: hash((label, tuple(sorted((tag, labels[neighbor])
+                                                          for tag, neighbor in graph.adjacency[component_id]))))
+                  for component_id, label in labels.items()}
+        history.append(labels)
+    return history
+
+def pair_bucket(bad_graph, good_graph, bad_ids, good_ids):
+    """Pairs within one label bucket: the only candidate on each side, else candidates sharing a unique name"""
+    if len(bad_ids) == 1 and len(good_ids) == 1:
+        return [(bad_ids[0], good_ids[0])]
+    bad_by_name, good_by_name = defaultdict(list), defaultdict(list)
+    for component_id in bad_ids:
+        bad_by_name[bad_graph.nodes[component_id]["Name"]].append(component_id)
+    for component_id in good_ids:
+        good_by_name[good_graph.nodes[component_id]["Name"]].append(component_id)
+    return [(bad_by_name[name][0], good_by_name[name][0]) for name in bad_by_name
+            if len(bad_by_name[name]) == 1 and len(good_by_name.get(name, ())) == 1]
+
+def parent_of(graph, component_id):
+    return next((neighbor for tag, neighbor in graph.adjacency[component_id] if tag == "parent"), None)
+
+def has_evidence(bad_graph, good_graph, bad_id, good_id, level, pairs, anchors):
+    """A pair shares more than its type: an anchored neighbor in its label, paired parents, or its name"""
+    if bad_graph.nodes[bad_id]["Name"] == good_graph.nodes[good_id]["Name"]:
+        return True
+    bad_parent = parent_of(bad_graph, bad_id)
+    if bad_parent is not None and pairs.get(bad_parent) == parent_of(good_graph, good_id):
+        return True
+    return level >= 1 and any(neighbor in anchors for _, neighbor in bad_graph.adjacency[bad_id])
+
+def match_components(bad_graph, good_graph, iterations=WL_ITERATIONS):
+    """Map Pre-validation component IDs to Post-validation IDs: same ID first, then by structure"""
+    pairs = {component_id: component_id for component_id, node in bad_graph.nodes.items()
+             if good_graph.nodes.get(component_id, {}).get("Kind") == node["Kind"]}
+    unmatched_bad = set(bad_graph.nodes) - set(pairs)
+    unmatched_good = set(good_graph.nodes) - set(pairs)
+
+    # Paired components anchor the labels of their neighbors on both sides, so every new pair can
+    # split buckets that were ambiguous before: repeat until a pass pairs nothing more
+    def initial(graph, label, anchors):
+        return {component_id: (label(node), anchors.get(component_id))
+                for component_id, node in graph.nodes.items()}
+
+    while unmatched_bad and unmatched_good:
+        paired_before = len(pairs)
+        bad_anchors = {bad_id: bad_id for bad_id in pairs}
+        good_anchors = {good_id: bad_id for bad_id, good_id in pairs.items()}
+        # Exact configuration first, then type only (renamed and reconfigured)
+        for label in (fine_label, coarse_label):
+            if not unmatched_bad or not unmatched_good:
+                break
+            bad_history = refine(bad_graph, initial(bad_graph, label, bad_anchors), iterations)
+            good_history = refine(good_graph, initial(good_graph, label, good_anchors), iterations)
+            for level in reversed(range(iterations + 1)):
+                buckets = defaultdict(lambda: ([], []))
+                for component_id in sorted(unmatched_bad):
+                    buckets[bad_history[level][component_id]][0].append(component_id)
+                for component_id in sorted(unmatched_good):
+                    buckets[good_history[level][component_id]][1].append(component_id)
+                for bad_ids, good_ids in buckets.values():
+                    if not bad_ids or not good_ids:
+                        continue
+                    for bad_id, good_id in pair_bucket(bad_graph, good_graph, bad_ids, good_ids):
+                        if not has_evidence(bad_graph, good_graph, bad_id, good_id, level, pairs, bad_anchors):
+                            continue
+                        pairs[bad_id] = good_id
+                        unmatched_bad.discard(bad_id)
+                        unmatched_good.discard(good_id)
+        if len(pairs) == paired_before:
+            break
+
+    return pairs
+
+def match_reports(bad_records, good_records):
+    """Structural changes and the components left unpaired on each side:
+    ([(kind, bad node, good node, changes)], {(kind, name) unpaired in bad}, {(kind, name) unpaired in good})"""
+    bad_graph, good_graph = build_graph(bad_records), build_graph(good_records)
+    pairs = match_components(bad_graph, good_graph)
+    paired_good = set(pairs.values())
+    unpaired_bad = {(node["Kind"], node["Name"]) for component_id, node in bad_graph.nodes.items() if component_id not in pairs}
+    unpaired_good = {(node["Kind"], node["Name"]) for component_id, node in good_graph.nodes.items()
+                     if component_id not in paired_good}
+    changed = []
+    for bad_id, good_id in pairs.items():
+        bad_node = {**bad_graph.nodes[bad_id], "ID": bad_id}
+        good_node = {**good_graph.nodes[good_id], "ID": good_id}
+        # A renamed group changes the path of everything below it, so "moved" compares the paired parents
+        bad_parent = parent_of(bad_graph, bad_id)
+        moved = pairs.get(bad_parent, bad_parent) != parent_of(good_graph, good_id)
+        changes = [change for change, differs in (("recreated", bad_id != good_id),
+                                                  ("renamed", bad_node["Name"] != good_node["Name"]),
+                                                  ("moved", moved))
+                   if differs]
+        if changes:
+            changed.append((bad_node["Kind"], bad_node, good_node, changes))
+    changed.sort(key=lambda item: (item[0], item[1]["Path"], item[1]["Name"]))
+    return changed, unpaired_bad, unpaired_good
+
+def structural_changes(bad_records, good_records):
+    """Components paired across the reports whose ID, name or parent changed: [(kind, bad node, good node, changes)]"""
+    return match_reports(bad_records, good_records)[0]
@@ -0,0 +1,105 @@
+import datetime
+import json
+import os
+import time
+
+import PreInfo
+from Compare import ensure_reports_directory, list_files_with_prefix, prompt_user_to_choose_file
+from Snapshot import iter_records, parse_report_lines, field_differences
+
+DEFAULT_INTERVAL_SECONDS = 300
+FULL_CAPTURE_EVERY = 12
+IGNORED_KINDS = {"connection_status", "health"}
+DRIFT_LOG = "drift_events.jsonl"
+
+def load_records(records):
+    """Index records by key, dropping kinds that change on every run (queue depths, bulletins)"""
+    return {key: fields for key, fields in records if key.split("|", 1)[0] not in IGNORED_KINDS}
+
+def capture_records(token):
+    """Run a full crawl and return its records indexed by key"""
+    output_lines, _ = PreInfo.build_report(token)
+    report_lines = "\n".join(output_lines).split("\n")
+    return load_records(parse_report_lines(report_lines))
+
+def diff_against_baseline(baseline, current):
+    """Return the drift of every record that differs from the baseline, keyed by record key"""
+    drift = {}
+    for key in set(baseline) | set(current):
+        if key not in current:
+            drift[key] = {"change": "missing", "differences": []}
+        elif key not in baseline:
+            drift[key] = {"change": "new", "differences": []}
+        else:
+            differences = field_differences(key.split("|", 1)[0], current[key], baseline[key])
+            if differences:
+                drift[key] = {"change": "changed", "differences": [
+                    {"field": field, "current": current_val, "baseline": baseline_val}
+                    for field, current_val, baseline_val in differences]}
+    return drift
+
+def append_drift_events(log_path, previous_drift, drift):
+    """Append an event for every key whose drift appeared, changed or was resolved; returns the count"""
+    now = datetime.datetime.now().isoformat(timespec="seconds")
+    events = []
+    for key in sorted(set(previous_drift) | set(drift)):
+        if key not in drift:
+            events.append({"timestamp": now, "key": key, "change": "resolved", "differences": []})
+        elif previous_drift.get(key) != drift[key]:
+            events.append({"timestamp": now, "key": key, **drift[key]})
+
+    with open(log_path, "a", encoding="utf-8") as log_file:
+        for event in events:
+            log_file.write(json.dumps(event) + "\n")
+    return len(events)
+
+def watch(baseline, log_path, interval):
+    """Re-check the cluster every interval; crawl only when the cheap fingerprint moves"""
+    previous_fingerprint = None
+    drift = {}
+    cycle = 0
+
+    while True:
+        now = datetime.datetime.now().strftime("%H:%M:%S")
+        try:
+            token = PreInfo.get_token()
+            fingerprint = PreInfo.get_flow_fingerprint(token)
+            if fingerprint != previous_fingerprint or cycle % FULL_CAPTURE_EVERY == 0:
+                current = capture_records(token)
+                new_drift = diff_against_baseline(baseline, current)
+                written = append_drift_events(log_path, drift, new_drift)
+                drift = new_drift
+                previous_fingerprint = fingerprint
+                print(f"[{now}] Full capture: {len(drift)} drifted component(s), {written} new event(s)")
+            else:
+                print(f"[{now}] No change detected (fingerprint {fingerprint[:12]})")
+        except Exception as e:
+            print(f"[{now}] ❌ Error during watch cycle: {e}")
+
+        cycle += 1
+        time.sleep(interval)
+
+def main():
+    print("=== NiFi Drift Watch ===\n")
+
+    reports_dir = ensure_reports_directory()
+    pre_files = list_files_with_prefix(reports_dir, "Nifi_Pre_Validation_Report_")
+    baseline_file = prompt_user_to_choose_file(pre_files, "Baseline (Pre-validation)")
+    if not baseline_file:
+        return
+
+    interval = input(f"Check interval in seconds (default {DEFAULT_INTERVAL_SECONDS}): ").strip()
+    interval = int(interval) if interval.isdigit() and int(interval) > 0 else DEFAULT_INTERVAL_SECONDS
+
+    baseline = load_records(iter_records(os.path.join(reports_dir, baseline_file)))
+    log_path = os.path.join(reports_dir, DRIFT_LOG)
+    print(f"\n➡️ Watching against baseline '{baseline_file}' every {interval}s")
+    print(f"📄 Drift events are appended to '{log_path}' (Ctrl+C to stop)\n")
+
+    try:
+        watch(baseline, log_path, interval)
+    except KeyboardInterrupt:
+        print("\n➡️ Watch stopped.")
+
+if __name__ == "__main__":
+    main()